@@ -0,0 +1,151 @@
+import datetime
+
+from django.contrib.admin.utils import (
+    FieldIsAForeignKeyColumnName,
+    _get_non_gfk_field,
+    display_for_field,
+    display_for_value,
+    lookup_field,
+)
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db import models
+from django.forms.utils import flatatt
+from django.utils.encoding import force_str
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+
+class ResultColumn:
+    """
+    A column of the results table in `IndexView`, compiled from an item in
+    `list_display` once per request. Whether the item is a model field, a
+    method or some other attribute, how its value is formatted and the CSS
+    classes it needs are all worked out up front, so that rendering each
+    cell doesn't have to repeat `lookup_field()`'s checks.
+    """
+
+    def __init__(self, view, field_name, request):
+        model_admin = view.model_admin
+        self.view = view
+        self.model_admin = model_admin
+        self.field_name = field_name
+        self.classes = ["field-%s" % field_name, "title"]
+        self.empty_value_display = model_admin.get_empty_value_display(field_name)
+        self.has_buttons = field_name == model_admin.get_list_display_add_buttons(
+            request
+        )
+
+        # The same checks as lookup_field(), which are always the same for
+        # every object in the listing. When neither applies, the value may be
+        # an attribute of the object itself, so is looked up for each object.
+        self.field = None
+        self.attr = None
+        try:
+            # Use the admin's own field lookup, so that generic foreign keys,
+            # reverse relations and '<fk>_id' names are treated as attributes
+            self.field = _get_non_gfk_field(view.opts, field_name)
+        except (FieldDoesNotExist, FieldIsAForeignKeyColumnName):
+            if callable(field_name):
+                self.attr = field_name
+            elif hasattr(model_admin, field_name) and field_name != "__str__":
+                self.attr = getattr(model_admin, field_name)
+
+        field = self.field
+        if field is not None and not field.auto_created:
+            if isinstance(
+                field, (models.DateField, models.TimeField, models.ForeignKey)
+            ):
+                self.classes.append("nowrap")
+
+    def lookup(self, obj):
+        """
+        Return a `(field, attr, value)` tuple for `obj`, as `lookup_field()`
+        does.
+        """
+        if self.field is not None:
+            return self.field, None, getattr(obj, self.field_name)
+        if self.attr is not None:
+            return None, self.attr, self.attr(obj)
+        return lookup_field(self.field_name, obj, self.model_admin)
+
+    def display(self, obj):
+        """
+        Return the formatted value of this column for `obj`, along with any
+        CSS classes that depend on the value.
+        """
+        empty_value_display = self.empty_value_display
+        try:
+            f, attr, value = self.lookup(obj)
+        except ObjectDoesNotExist:
+            return empty_value_display, []
+
+        empty_value_display = getattr(attr, "empty_value_display", empty_value_display)
+        if f is None or f.auto_created:
+            allow_tags = getattr(attr, "allow_tags", False)
+            boolean = getattr(attr, "boolean", False)
+            if boolean or not value:
+                allow_tags = True
+            result_repr = display_for_value(value, empty_value_display, boolean)
+
+            # Strip HTML tags in the resulting text, except if the
+            # function has an "allow_tags" attribute set to True.
+            if allow_tags:
+                result_repr = mark_safe(result_repr)
+            if isinstance(value, (datetime.date, datetime.time)):
+                return result_repr, ["nowrap"]
+            return result_repr, []
+
+        if isinstance(f, models.ManyToOneRel):
+            field_val = getattr(obj, f.name)
+            if field_val is None:
+                return empty_value_display, []
+            return field_val, []
+        return display_for_field(value, f, empty_value_display), []
+
+    def get_cell(self, obj):
+        """
+        Return a dictionary describing the cell for this column for `obj`,
+        with the `attrs` for the `<td>` element, its `value` and, if this is
+        the column action buttons are added to, the object's primary
+        `button`.
+        """
+        model_admin = self.model_admin
+        field_name = self.field_name
+        result_repr, value_classes = self.display(obj)
+        if force_str(result_repr) == "":
+            result_repr = mark_safe("&nbsp;")
+        row_classes = self.classes + value_classes
+        row_classes.extend(
+            model_admin.get_extra_class_names_for_field_col(obj, field_name)
+        )
+        row_attrs = model_admin.get_extra_attrs_for_field_col(obj, field_name)
+        row_attrs["class"] = " ".join(row_classes)
+        primary_button = None
+        if self.has_buttons:
+            primary_button = self.view.button_helper.get_primary_button(obj)
+            if primary_button is not None and not primary_button.get("url"):
+                primary_button = None
+        return {
+            "attrs": flatatt(row_attrs),
+            "value": result_repr,
+            "add_action_buttons": self.has_buttons,
+            "button": primary_button,
+        }
+
+    def render(self, obj):
+        """
+        Return the `<td>` element for this column for `obj`, including the
+        object's primary action button if this is the column they are added
+        to.
+        """
+        cell = self.get_cell(obj)
+        primary_button = cell["button"]
+        if primary_button is not None:
+            return format_html(
+                '<td{}><div class="title-wrapper"><a href="{}" title="{}">{}</a></div></td>',
+                cell["attrs"],
+                primary_button["url"],
+                primary_button.get("title", ""),
+                cell["value"],
+            )
+        return format_html("<td{}>{}</td>", cell["attrs"], cell["value"])
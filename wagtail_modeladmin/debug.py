@@ -0,0 +1,71 @@
+import warnings
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, router
+
+
+class RowQueryWarning(RuntimeWarning):
+    pass
+
+
+class RowQueryCounter:
+    """
+    Counts the database queries run while rendering each row of an index view
+    listing, and warns when more than one row needed its own queries, which
+    usually means a relation used by ``list_display`` (or by a method such as
+    ``get_extra_attrs_for_row()``) is missing from ``list_select_related`` or
+    ``list_prefetch_related``.
+
+    Counting is only enabled when the ``WAGTAIL_MODELADMIN_WARN_ROW_QUERIES``
+    setting is ``True``.
+    """
+
+    def __init__(self, view, num_rows):
+        self.view = view
+        self.num_rows = num_rows
+        self.enabled = getattr(settings, "WAGTAIL_MODELADMIN_WARN_ROW_QUERIES", False)
+        self.using = router.db_for_read(view.model)
+        self.counts = {}
+        self.finished = set()
+
+    @contextmanager
+    def row(self, index):
+        if not self.enabled:
+            yield
+            return
+
+        def count_query(execute, sql, params, many, context):
+            self.counts[index] = self.counts.get(index, 0) + 1
+            return execute(sql, params, many, context)
+
+        with connections[self.using].execute_wrapper(count_query):
+            yield
+
+    def finish_row(self, index):
+        """
+        Marks the row at ``index`` as fully rendered, warning once every row
+        has been rendered if any of them ran queries of their own.
+        """
+        if not self.enabled:
+            return
+        self.finished.add(index)
+        if len(self.finished) < self.num_rows:
+            return
+        rows = [index for index, count in self.counts.items() if count]
+        if len(rows) > 1:
+            warnings.warn(
+                "%d of the %d rows in the listing for %s ran their own "
+                "database queries while rendering (%d queries in total). Add "
+                "the relations they use to 'list_select_related' or "
+                "'list_prefetch_related' on %s."
+                % (
+                    len(rows),
+                    self.num_rows,
+                    self.view.opts.label,
+                    sum(self.counts.values()),
+                    type(self.view.model_admin).__name__,
+                ),
+                category=RowQueryWarning,
+                stacklevel=2,
+            )
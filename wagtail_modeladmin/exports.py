@@ -0,0 +1,206 @@
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+_executor = None
+
+
+def get_export_dir():
+    """
+    Returns the local directory that background exports are spooled to,
+    from the ``WAGTAIL_MODELADMIN_EXPORT_DIR`` setting.
+    """
+    return getattr(
+        settings,
+        "WAGTAIL_MODELADMIN_EXPORT_DIR",
+        os.path.join(tempfile.gettempdir(), "wagtail_modeladmin_exports"),
+    )
+
+
+def get_executor():
+    """
+    Returns the thread pool that runs background exports, sized by the
+    ``WAGTAIL_MODELADMIN_EXPORT_WORKERS`` setting, or ``None`` if exports
+    should run immediately in the requesting thread.
+    """
+    global _executor
+    max_workers = getattr(settings, "WAGTAIL_MODELADMIN_EXPORT_WORKERS", 2)
+    if not max_workers:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="modeladmin-export"
+        )
+    return _executor
+
+
+class ExportJob:
+    """
+    A spreadsheet export that is written to local storage in the
+    background. The state of the job is kept in a JSON file alongside the
+    export itself, so that any process on the same host can report on its
+    progress without a database table or message broker.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+    # Write the job's progress to disk after this many rows
+    progress_interval = 500
+
+    def __init__(self, job_id, state, directory=None):
+        self.id = job_id
+        self.state = state
+        self.directory = directory or get_export_dir()
+
+    @classmethod
+    def create(cls, user, export_format, filename):
+        directory = get_export_dir()
+        os.makedirs(directory, exist_ok=True)
+        cls.delete_expired(directory)
+        job = cls(
+            uuid.uuid4().hex,
+            {
+                "status": cls.QUEUED,
+                "user_id": user.pk,
+                "format": export_format,
+                "filename": "%s.%s" % (filename, export_format),
+                "rows": 0,
+                "total": None,
+                "created_at": time.time(),
+            },
+            directory,
+        )
+        job.save()
+        return job
+
+    @classmethod
+    def get(cls, job_id):
+        """
+        Returns the job with the given id, or ``None`` if there isn't one.
+        """
+        try:
+            job_id = uuid.UUID(job_id).hex
+        except ValueError:
+            return None
+        job = cls(job_id, {})
+        try:
+            with open(job.state_path) as f:
+                job.state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return job
+
+    @classmethod
+    def delete_expired(cls, directory):
+        """
+        Removes exports (and their state) that are older than the
+        ``WAGTAIL_MODELADMIN_EXPORT_MAX_AGE`` setting, in seconds.
+        """
+        max_age = getattr(settings, "WAGTAIL_MODELADMIN_EXPORT_MAX_AGE", 86400)
+        cutoff = time.time() - max_age
+        for entry in os.scandir(directory):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    @property
+    def state_path(self):
+        return os.path.join(self.directory, "%s.json" % self.id)
+
+    @property
+    def output_path(self):
+        return os.path.join(self.directory, "%s.%s" % (self.id, self.state["format"]))
+
+    @property
+    def status(self):
+        return self.state["status"]
+
+    @property
+    def is_finished(self):
+        return self.status in (self.COMPLETE, self.FAILED)
+
+    @property
+    def progress(self):
+        """
+        Returns the percentage of rows written so far, or ``None`` if the
+        number of rows to export isn't known yet.
+        """
+        if self.status == self.COMPLETE:
+            return 100
+        total = self.state["total"]
+        if not total:
+            return None
+        return min(int(self.state["rows"] * 100 / total), 100)
+
+    def belongs_to(self, user):
+        return self.state["user_id"] == user.pk
+
+    def save(self, **state):
+        self.state.update(state)
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(temp_path, self.state_path)
+
+    def track(self, rows):
+        """
+        Yields each item from ``rows``, recording progress as it goes.
+        """
+        count = 0
+        for count, row in enumerate(rows, 1):
+            yield row
+            if count % self.progress_interval == 0:
+                self.save(rows=count)
+        self.save(rows=count)
+
+    def run(self, view, queryset):
+        """
+        Writes the export using ``view``'s spreadsheet export methods, to a
+        temporary file that replaces the output file once complete.
+        """
+        temp_path = self.output_path + ".part"
+        try:
+            self.save(status=self.RUNNING, total=queryset.count())
+            rows = self.track(view.get_export_iterator(queryset))
+            with open(temp_path, "wb") as f:
+                if self.state["format"] == view.FORMAT_CSV:
+                    f.writelines(view.stream_csv(rows))
+                else:
+                    view.write_xlsx(rows, f)
+            os.replace(temp_path, self.output_path)
+        except Exception as e:  # noqa: BLE001
+            # Record the failure so that it can be reported to the user,
+            # rather than leaving the job running forever
+            self.save(status=self.FAILED, error=str(e))
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        else:
+            self.save(status=self.COMPLETE)
+
+    def _run_in_thread(self, view, queryset):
+        try:
+            self.run(view, queryset)
+        finally:
+            connections.close_all()
+
+    def submit(self, view, queryset):
+        """
+        Queues the job to be run by the export thread pool, or runs it
+        straight away if background workers are disabled.
+        """
+        executor = get_executor()
+        if executor is None:
+            self.run(view, queryset)
+        else:
+            executor.submit(self._run_in_thread, view, queryset)
@@ -0,0 +1,85 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import models
+
+
+class FacetCounter:
+    """
+    Counts the results of an ``IndexView`` listing matching each choice of
+    its list filters, using a single query with a conditional aggregate for
+    every choice of every filter, rather than a query for each filter.
+
+    Counts are made against the currently filtered queryset, and are cached
+    for the ModelAdmin's ``facets_cache_timeout`` seconds, if set.
+    """
+
+    cache_prefix = "wagtail_modeladmin:facets"
+
+    def __init__(self, view, queryset):
+        self.view = view
+        self.queryset = queryset
+        self.filter_specs = view.filter_specs
+        self.cache_timeout = view.model_admin.facets_cache_timeout
+
+    @property
+    def enabled(self):
+        # Search results from a search backend can't be aggregated
+        return isinstance(self.queryset, models.QuerySet)
+
+    def get_aggregates(self):
+        """
+        Returns a dictionary of the aggregates to count, with the keys of
+        each filter's counts prefixed with the filter's index.
+        """
+        queryset = self.queryset
+        aggregates = {}
+        for index, spec in enumerate(self.filter_specs):
+            try:
+                counts = spec.get_facet_counts(self.view.pk_attname, queryset)
+            except (AttributeError, NotImplementedError):
+                continue
+            for key, aggregate in counts.items():
+                aggregates["%d_%s" % (index, key)] = aggregate
+        return aggregates
+
+    def get_cache_key(self, aggregates):
+        try:
+            sql, params = self.queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        key = repr((self.view.opts.label, sql, params, sorted(aggregates)))
+        return "%s:%s" % (self.cache_prefix, hashlib.md5(key.encode()).hexdigest())
+
+    def get_counts(self):
+        """
+        Returns a dictionary mapping the index of each filter to its counts,
+        in the form returned by ``ListFilter.get_facet_queryset()``.
+        """
+        aggregates = self.get_aggregates()
+        if not aggregates:
+            return {}
+
+        cache_key = self.get_cache_key(aggregates) if self.cache_timeout else None
+        results = cache.get(cache_key) if cache_key else None
+        if results is None:
+            results = self.queryset.order_by().aggregate(**aggregates)
+            if cache_key:
+                cache.set(cache_key, results, self.cache_timeout)
+
+        counts = {}
+        for key, value in results.items():
+            index, key = key.split("_", 1)
+            counts.setdefault(int(index), {})[key] = value
+        return counts
+
+    def apply(self):
+        """
+        Makes each filter's choices include the counts, without the filters
+        querying for them again.
+        """
+        counts = self.get_counts()
+        for index, spec in enumerate(self.filter_specs):
+            spec.get_facet_queryset = lambda changelist, c=counts.get(index, {}): c
+        self.view.add_facets = True
@@ -0,0 +1,163 @@
+import hashlib
+from functools import reduce
+from operator import or_
+
+from django.contrib.admin.filters import RelatedFieldListFilter
+from django.contrib.admin.utils import get_model_from_relation
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import CharField, Q
+from django.db.models.signals import post_delete, post_save
+
+from .helpers.permission import bump_generation, get_generation
+
+
+class LazyRelatedFieldListFilter(RelatedFieldListFilter):
+    """
+    A list filter for a relation to a model with too many objects to list
+    them all as choices. Only the selected object is loaded and shown, along
+    with a search box that fetches matching choices from the ModelAdmin's
+    'filter_choices' URL.
+
+    Choices are searched for in the database, in `search_fields` of the
+    related model (by default, its text fields). The results of each search
+    are cached, and the cache is cleared whenever an object of the related
+    model is saved or deleted.
+
+    Use it by naming the field along with this class in `list_filter`:
+
+        list_filter = (("author", LazyRelatedFieldListFilter),)
+    """
+
+    template = "modeladmin/includes/lazy_filter.html"
+    cache_timeout = 3600
+    max_results = 20
+    search_fields = None
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.model = model
+        self.model_admin = model_admin
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        # Only the selected object is needed to render the filter
+        if self.lookup_val is None:
+            return []
+        target_field = field.target_field.name
+        try:
+            objs = field.related_model._default_manager.filter(
+                **{"%s__in" % target_field: self.lookup_val}
+            )
+            return [(getattr(obj, target_field), str(obj)) for obj in objs]
+        except (ValueError, ValidationError):
+            return []
+
+    def has_output(self):
+        return True
+
+    def get_choices_url(self):
+        return self.model_admin.url_helper.get_action_url(
+            "filter_choices", self.field_path
+        )
+
+    def get_search_fields(self):
+        """
+        Return the fields of the related model to search for choices:
+        `search_fields` if set, or otherwise its text fields.
+        """
+        if self.search_fields is not None:
+            return self.search_fields
+        return [
+            field.name
+            for field in self.field.related_model._meta.concrete_fields
+            if isinstance(field, CharField) and not field.choices
+        ]
+
+    def get_choices_queryset(self, query):
+        """
+        Return a queryset of the related objects that can be chosen, in the
+        same order as `RelatedFieldListFilter` lists them, filtered to those
+        with a search field containing `query`.
+        """
+        field = self.field
+        queryset = field.related_model._default_manager.complex_filter(
+            field.get_limit_choices_to()
+        )
+        ordering = self.field_admin_ordering(field, self.request, self.model_admin)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        search_fields = self.get_search_fields()
+        if query and search_fields:
+            queryset = queryset.filter(
+                reduce(
+                    or_,
+                    (
+                        Q(**{"%s__icontains" % search_field: query})
+                        for search_field in search_fields
+                    ),
+                )
+            )
+        return queryset
+
+    @classmethod
+    def get_generation_key(cls, related_model):
+        return "wagtail_modeladmin:filter_choices_generation:%s" % (
+            related_model._meta.label
+        )
+
+    def get_cache_key(self, query):
+        key = repr(
+            (
+                self.model._meta.label,
+                self.field_path,
+                list(self.get_search_fields()),
+                query,
+                self.max_results,
+            )
+        )
+        return "wagtail_modeladmin:filter_choices:%s:%s" % (
+            get_generation(self.get_generation_key(self.field.related_model)),
+            hashlib.md5(key.encode()).hexdigest(),
+        )
+
+    def search_choices(self, query):
+        """
+        Return up to `max_results` `(value, label)` tuples for the related
+        objects matching `query`, and whether there are more, from the cache
+        if possible.
+        """
+        query = query.strip()
+        key = self.get_cache_key(query.casefold())
+        cached = cache.get(key)
+        if cached is None:
+            value_attr = self.field.target_field.attname
+            # Fetch one more than is needed, to find out whether there are more
+            objs = list(self.get_choices_queryset(query)[: self.max_results + 1])
+            cached = (
+                [
+                    (getattr(obj, value_attr), str(obj))
+                    for obj in objs[: self.max_results]
+                ],
+                len(objs) > self.max_results,
+            )
+            cache.set(key, cached, self.cache_timeout)
+        return cached
+
+    @classmethod
+    def register_cache_invalidation(cls, field):
+        """
+        Clear the cached choices whenever an object of the related model of
+        `field` is saved or deleted.
+        """
+        related_model = get_model_from_relation(field)
+        for signal in (post_save, post_delete):
+            signal.connect(
+                clear_choices_cache,
+                sender=related_model,
+                dispatch_uid="wagtail_modeladmin_filter_choices_%s"
+                % related_model._meta.label,
+            )
+
+
+def clear_choices_cache(sender, **kwargs):
+    bump_generation(LazyRelatedFieldListFilter.get_generation_key(sender))
@@ -1,4 +1,8 @@
 from .button import ButtonHelper, PageButtonHelper  # NOQA: F401
 from .permission import PagePermissionHelper, PermissionHelper  # NOQA: F401
-from .search import DjangoORMSearchHandler, WagtailBackendSearchHandler  # NOQA: F401
+from .search import (  # NOQA: F401
+    DatabaseFullTextSearchHandler,
+    DjangoORMSearchHandler,
+    WagtailBackendSearchHandler,
+)
 from .url import AdminURLHelper, ModelAdminURLFinder, PageAdminURLHelper  # NOQA: F401
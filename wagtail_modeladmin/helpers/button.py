@@ -1,6 +1,7 @@
 from django.contrib.admin.utils import quote
 from django.utils.encoding import force_str
 from django.utils.translation import gettext as _
+from wagtail.models import Page
 
 
 class ButtonHelper:
@@ -19,6 +20,7 @@ class ButtonHelper:
         self.verbose_name_plural = force_str(self.opts.verbose_name_plural)
         self.permission_helper = view.permission_helper
         self.url_helper = view.url_helper
+        self.obj_permissions = {}
 
     def finalise_classname(self, classnames_add=None, classnames_exclude=None):
         if classnames_add is None:
@@ -86,6 +88,31 @@ class ButtonHelper:
             "title": _("Delete this %(object)s") % {"object": self.verbose_name},
         }
 
+    def get_required_fields(self):
+        """
+        Return the names of the fields that must be loaded on each object in
+        a listing for its buttons to be generated without further queries.
+        """
+        return [self.opts.pk.name]
+
+    def prefetch_permissions(self, objs):
+        """
+        Check the current user's permissions on all of `objs` at once, for
+        `get_buttons_for_obj()` and `get_primary_button()` to use.
+        """
+        self.obj_permissions.update(
+            self.permission_helper.get_permissions_for_objs(self.request.user, objs)
+        )
+
+    def get_permissions_for_obj(self, obj):
+        """
+        Return the set of actions the current user is permitted to carry out
+        on `obj`, checking them now if `prefetch_permissions()` hasn't.
+        """
+        if obj.pk not in self.obj_permissions:
+            self.prefetch_permissions([obj])
+        return self.obj_permissions[obj.pk]
+
     def get_buttons_for_obj(
         self, obj, exclude=None, classnames_add=None, classnames_exclude=None
     ):
@@ -95,25 +122,23 @@ class ButtonHelper:
             classnames_add = []
         if classnames_exclude is None:
             classnames_exclude = []
-        ph = self.permission_helper
-        usr = self.request.user
+        perms = self.get_permissions_for_obj(obj)
         pk = getattr(obj, self.opts.pk.attname)
         btns = []
-        if "inspect" not in exclude and ph.user_can_inspect_obj(usr, obj):
+        if "inspect" not in exclude and "inspect" in perms:
             btns.append(self.inspect_button(pk, classnames_add, classnames_exclude))
-        if "edit" not in exclude and ph.user_can_edit_obj(usr, obj):
+        if "edit" not in exclude and "edit" in perms:
             btns.append(self.edit_button(pk, classnames_add, classnames_exclude))
-        if "delete" not in exclude and ph.user_can_delete_obj(usr, obj):
+        if "delete" not in exclude and "delete" in perms:
             btns.append(self.delete_button(pk, classnames_add, classnames_exclude))
         return btns
 
     def get_primary_button(self, obj):
-        ph = self.permission_helper
-        usr = self.request.user
+        perms = self.get_permissions_for_obj(obj)
         pk = getattr(obj, self.opts.pk.attname)
-        if ph.user_can_edit_obj(usr, obj):
+        if "edit" in perms:
             return self.edit_button(pk)
-        if ph.user_can_inspect_obj(usr, obj):
+        if "inspect" in perms:
             return self.inspect_button(pk)
 
 
@@ -121,6 +146,13 @@ class PageButtonHelper(ButtonHelper):
     unpublish_button_classnames = []
     copy_button_classnames = []
 
+    def get_required_fields(self):
+        # Page permission checks use the page's position in the tree, as well
+        # as its live and locked status, so keep all of the base Page fields
+        return super().get_required_fields() + [
+            field.name for field in Page._meta.concrete_fields
+        ]
+
     def unpublish_button(self, pk, classnames_add=None, classnames_exclude=None):
         if classnames_add is None:
             classnames_add = []
@@ -158,18 +190,17 @@ class PageButtonHelper(ButtonHelper):
             classnames_add = []
         if classnames_exclude is None:
             classnames_exclude = []
-        ph = self.permission_helper
-        usr = self.request.user
+        perms = self.get_permissions_for_obj(obj)
         pk = getattr(obj, self.opts.pk.attname)
         btns = []
-        if "inspect" not in exclude and ph.user_can_inspect_obj(usr, obj):
+        if "inspect" not in exclude and "inspect" in perms:
             btns.append(self.inspect_button(pk, classnames_add, classnames_exclude))
-        if "edit" not in exclude and ph.user_can_edit_obj(usr, obj):
+        if "edit" not in exclude and "edit" in perms:
             btns.append(self.edit_button(pk, classnames_add, classnames_exclude))
-        if "copy" not in exclude and ph.user_can_copy_obj(usr, obj):
+        if "copy" not in exclude and "copy" in perms:
             btns.append(self.copy_button(pk, classnames_add, classnames_exclude))
-        if "unpublish" not in exclude and ph.user_can_unpublish_obj(usr, obj):
+        if "unpublish" not in exclude and "unpublish" in perms:
             btns.append(self.unpublish_button(pk, classnames_add, classnames_exclude))
-        if "delete" not in exclude and ph.user_can_delete_obj(usr, obj):
+        if "delete" not in exclude and "delete" in perms:
             btns.append(self.delete_button(pk, classnames_add, classnames_exclude))
         return btns
@@ -1,8 +1,119 @@
-from django.contrib.auth import get_permission_codename
-from django.contrib.auth.models import Permission
+import hashlib
+import uuid
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.auth import get_permission_codename, get_user_model
+from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.utils.functional import cached_property
-from wagtail.models import Page
+from wagtail.models import GroupPagePermission, Page, WorkflowState, get_page_models
+from wagtail.signals import post_page_move
+
+PERMISSIONS_GENERATION_KEY = "wagtail_modeladmin:permissions_generation"
+PAGE_PERMISSIONS_GENERATION_KEY = "wagtail_modeladmin:page_permissions_generation"
+
+
+def get_generation(key):
+    """
+    Return the current generation stored in the cache under `key`, which is
+    included in the keys of (or stored with) cached values, so that bumping
+    it invalidates them.
+    """
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(key):
+    cache.set(key, uuid.uuid4().hex, None)
+
+
+def get_permissions_generation():
+    return get_generation(PERMISSIONS_GENERATION_KEY)
+
+
+def bump_permissions_generation(**kwargs):
+    bump_generation(PERMISSIONS_GENERATION_KEY)
+
+
+def get_page_permissions_generation():
+    return get_generation(PAGE_PERMISSIONS_GENERATION_KEY)
+
+
+def bump_page_permissions_generation(**kwargs):
+    bump_generation(PAGE_PERMISSIONS_GENERATION_KEY)
+
+
+def page_tree_changed(sender, instance, created=True, **kwargs):
+    if created and isinstance(instance, Page):
+        bump_page_permissions_generation()
+
+
+def compile_path_prefixes(paths):
+    """
+    Return the shortest list of treebeard paths that match the same pages as
+    `paths` and their descendants, by leaving out paths nested within others.
+    """
+    prefixes = []
+    for path in sorted(set(paths)):
+        if not prefixes or not path.startswith(prefixes[-1]):
+            prefixes.append(path)
+    return prefixes
+
+
+class PermissionSnapshot:
+    """
+    The model permissions of a user, loaded with a single call to
+    `user.get_all_permissions()`, so that most permission checks made while
+    handling a request can be answered without asking the authentication
+    backends again. Permissions missing from the snapshot are checked with
+    `user.has_perm()` (once each), for backends that grant permissions
+    without listing them. Use `get_permission_snapshot()` to get the
+    snapshot for the current request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        # As in PermissionsMixin.has_perm(), active superusers have every
+        # permission without asking the backends
+        self.is_superuser = user.is_active and getattr(user, "is_superuser", False)
+        if self.is_superuser:
+            self.perms = frozenset()
+        else:
+            self.perms = frozenset(user.get_all_permissions())
+        self.checked_perms = {}
+
+    def has_perm(self, perm):
+        if self.is_superuser or perm in self.perms:
+            return True
+        if perm not in self.checked_perms:
+            self.checked_perms[perm] = self.user.has_perm(perm)
+        return self.checked_perms[perm]
+
+    def has_any_perm(self, perms):
+        if self.is_superuser or not self.perms.isdisjoint(perms):
+            return True
+        return any(self.has_perm(perm) for perm in perms)
+
+
+def get_permission_snapshot(user):
+    """
+    Return a `PermissionSnapshot` of `user`'s permissions, which is stored on
+    `user`, so (like Django's own permission cache) lasts for the rest of the
+    request.
+    """
+    try:
+        return user._modeladmin_permission_snapshot
+    except AttributeError:
+        snapshot = user._modeladmin_permission_snapshot = PermissionSnapshot(user)
+        return snapshot
 
 
 class PermissionHelper:
@@ -36,26 +147,32 @@ class PermissionHelper:
             .distinct()
         )
 
+    @cached_property
+    def all_permission_names(self):
+        return frozenset(
+            "%s.%s" % (self.opts.app_label, perm_codename)
+            for perm_codename in self.all_permission_codenames
+        )
+
     def get_perm_codename(self, action):
         return get_permission_codename(action, self.opts)
 
     def user_has_specific_permission(self, user, perm_codename):
         """
-        Combine `perm_codename` with `self.opts.app_label` to call the provided
-        Django user's built-in `has_perm` method.
+        Combine `perm_codename` with `self.opts.app_label` to check whether
+        the provided Django user has that permission, using a snapshot of
+        their permissions taken once per request.
         """
-
-        return user.has_perm("%s.%s" % (self.opts.app_label, perm_codename))
+        return get_permission_snapshot(user).has_perm(
+            "%s.%s" % (self.opts.app_label, perm_codename)
+        )
 
     def user_has_any_permissions(self, user):
         """
         Return a boolean to indicate whether `user` has any model-wide
         permissions
         """
-        for perm_codename in self.all_permission_codenames:
-            if self.user_has_specific_permission(user, perm_codename):
-                return True
-        return False
+        return get_permission_snapshot(user).has_any_perm(self.all_permission_names)
 
     def user_can_list(self, user):
         """
@@ -101,6 +218,52 @@ class PermissionHelper:
     def user_can_copy_obj(self, user, obj):
         return False
 
+    @classmethod
+    def register_cache_invalidation(cls):
+        """
+        Invalidate model permissions cached between requests whenever the
+        permissions of a user or group, or the groups of a user, change.
+        """
+        User = get_user_model()
+        senders = [
+            getattr(User, field_name).through
+            for field_name in ("groups", "user_permissions")
+            if hasattr(User, field_name)
+        ]
+        senders.append(Group.permissions.through)
+        for sender in senders:
+            m2m_changed.connect(
+                bump_permissions_generation,
+                sender=sender,
+                dispatch_uid="wagtail_modeladmin_permissions",
+            )
+        post_delete.connect(
+            bump_permissions_generation,
+            sender=Permission,
+            dispatch_uid="wagtail_modeladmin_permissions",
+        )
+
+    def get_permissions_for_objs(self, user, objs):
+        """
+        Return a dictionary mapping the primary key of each of `objs` to the
+        set of actions ('inspect', 'edit', 'delete', 'unpublish' and 'copy')
+        that `user` is permitted to carry out on it.
+
+        Model-wide permissions are cached on `user` after the first check, so
+        the `user_can_*_obj()` methods are simply called for each object.
+        """
+        checks = {
+            "inspect": self.user_can_inspect_obj,
+            "edit": self.user_can_edit_obj,
+            "delete": self.user_can_delete_obj,
+            "unpublish": self.user_can_unpublish_obj,
+            "copy": self.user_can_copy_obj,
+        }
+        return {
+            obj.pk: {action for action, check in checks.items() if check(user, obj)}
+            for obj in objs
+        }
+
 
 class PagePermissionHelper(PermissionHelper):
     """
@@ -111,12 +274,96 @@ class PagePermissionHelper(PermissionHelper):
     object-specific basis.
     """
 
+    add_page_path_prefixes_cache_timeout = 0
+    valid_parent_pages_cache_timeout = 0
+    valid_parent_pages_cache_max = 1000
+
+    def get_user_cache(self, user):
+        """
+        Return a dictionary for caching things about `user` and `self.model`.
+        It is stored on `user`, which (like Django's own permission cache)
+        lasts for the rest of the request.
+        """
+        try:
+            caches = user._modeladmin_page_permission_cache
+        except AttributeError:
+            caches = user._modeladmin_page_permission_cache = {}
+        return caches.setdefault(self.model, {})
+
     def get_valid_parent_pages(self, user):
         """
         Identifies possible parent pages for the current user by first looking
         at allowed_parent_page_models() on self.model to limit options to the
         correct type of page, then checking permissions on those individual
         pages to make sure we have permission to add a subpage to it.
+
+        The queryset is only built once for each request, and if
+        `valid_parent_pages_cache_timeout` is set, the pages found are cached
+        between requests for all users in the same groups.
+        """
+        user_cache = self.get_user_cache(user)
+        if "valid_parent_pages" not in user_cache:
+            user_cache["valid_parent_pages"] = self.get_cached_valid_parent_pages(user)
+        return user_cache["valid_parent_pages"]
+
+    def get_valid_parent_pages_cache_key(self, user):
+        if user.is_superuser:
+            users = "superuser"
+        else:
+            # Page permissions are granted to groups, so users in the same
+            # groups share the same valid parent pages
+            users = ",".join(
+                str(pk) for pk in sorted(user.groups.values_list("pk", flat=True))
+            )
+        key = repr((self.opts.label, users))
+        return "wagtail_modeladmin:valid_parent_pages:%s:%s" % (
+            get_page_permissions_generation(),
+            hashlib.md5(key.encode()).hexdigest(),
+        )
+
+    def get_cached_valid_parent_pages(self, user):
+        """
+        Return the queryset from `build_valid_parent_pages()`, or if
+        `valid_parent_pages_cache_timeout` is set, a queryset of the pages it
+        returned, whose primary keys are cached in Django's default cache.
+        The cache is invalidated whenever pages are created, moved or
+        deleted, or page permissions change.
+        """
+        if not self.valid_parent_pages_cache_timeout:
+            return self.build_valid_parent_pages(user)
+        key = self.get_valid_parent_pages_cache_key(user)
+        pks = cache.get(key)
+        if pks is None:
+            queryset = self.build_valid_parent_pages(user)
+            # Fetch one more than can be cached, to find out whether there
+            # are too many
+            pks = list(
+                queryset.values_list("pk", flat=True)[
+                    : self.valid_parent_pages_cache_max + 1
+                ]
+            )
+            if len(pks) > self.valid_parent_pages_cache_max:
+                return queryset
+            cache.set(key, pks, self.valid_parent_pages_cache_timeout)
+        return Page.objects.filter(pk__in=pks)
+
+    def peek_valid_parent_pages(self, user):
+        """
+        Return a list of up to two of the pages returned by
+        `get_valid_parent_pages()`, which is enough to tell whether there
+        are none, exactly one or several, fetched once for each request.
+        """
+        user_cache = self.get_user_cache(user)
+        if "valid_parent_pages_peek" not in user_cache:
+            user_cache["valid_parent_pages_peek"] = list(
+                self.get_valid_parent_pages(user)[:2]
+            )
+        return user_cache["valid_parent_pages_peek"]
+
+    def build_valid_parent_pages(self, user):
+        """
+        Return a queryset of the pages `user` can add a page of `self.model`
+        to, for `get_valid_parent_pages()`.
         """
         # Get queryset of pages where this page type can be added
         allowed_parent_page_content_types = list(
@@ -130,27 +377,82 @@ class PagePermissionHelper(PermissionHelper):
 
         # Get queryset of pages where the user has permission to add subpages
         if user.is_superuser:
-            pages_where_user_can_add = Page.objects.all()
-        else:
-            pages_where_user_can_add = Page.objects.none()
+            return allowed_parent_pages
+        prefixes = self.get_add_page_path_prefixes(user)
+        if not prefixes:
+            return Page.objects.none()
+        return allowed_parent_pages.filter(
+            reduce(or_, (Q(path__startswith=prefix) for prefix in prefixes))
+        )
 
-            from wagtail.permission_policies.pages import PagePermissionPolicy
+    def get_add_page_path_prefixes(self, user):
+        """
+        Return the paths of the pages where `user` can add subpages, below
+        which (including the pages themselves) they can add pages. Paths of
+        pages within another of the pages are left out. The paths are worked
+        out once for each request, and if `add_page_path_prefixes_cache_timeout`
+        is set, cached between requests until page permissions or the page
+        tree change.
+        """
+        user_cache = self.get_user_cache(user)
+        if "add_page_path_prefixes" not in user_cache:
+            user_cache["add_page_path_prefixes"] = (
+                self.get_cached_add_page_path_prefixes(user)
+            )
+        return user_cache["add_page_path_prefixes"]
 
-            perms = {
-                perm
-                for perm in PagePermissionPolicy().get_cached_permissions_for_user(user)
-                if perm.permission.codename == "add_page"
-            }
+    def get_cached_add_page_path_prefixes(self, user):
+        if not self.add_page_path_prefixes_cache_timeout:
+            return self.build_add_page_path_prefixes(user)
+        key = "wagtail_modeladmin:add_page_path_prefixes:%s:%s" % (
+            get_page_permissions_generation(),
+            user.pk,
+        )
+        prefixes = cache.get(key)
+        if prefixes is None:
+            prefixes = self.build_add_page_path_prefixes(user)
+            cache.set(key, prefixes, self.add_page_path_prefixes_cache_timeout)
+        return prefixes
 
-            for perm in perms:
-                # user has add permission on any subpage of perm.page
-                # (including perm.page itself)
-                pages_where_user_can_add |= Page.objects.descendant_of(
-                    perm.page, inclusive=True
-                )
+    def build_add_page_path_prefixes(self, user):
+        from wagtail.permission_policies.pages import PagePermissionPolicy
 
-        # Combine them
-        return allowed_parent_pages & pages_where_user_can_add
+        return compile_path_prefixes(
+            perm.page.path
+            for perm in PagePermissionPolicy().get_cached_permissions_for_user(user)
+            if perm.permission.codename == "add_page"
+        )
+
+    @classmethod
+    def register_cache_invalidation(cls):
+        """
+        Invalidate cached page permissions whenever group page permissions or
+        the groups of a user change, or pages are created, moved or deleted.
+        """
+        super().register_cache_invalidation()
+        receivers = [
+            (post_save, GroupPagePermission),
+            (post_delete, GroupPagePermission),
+            (post_page_move, None),
+        ]
+        groups = getattr(get_user_model(), "groups", None)
+        if groups is not None:
+            receivers.append((m2m_changed, groups.through))
+        for signal, sender in receivers:
+            signal.connect(
+                bump_page_permissions_generation,
+                sender=sender,
+                dispatch_uid="wagtail_modeladmin_page_permissions",
+            )
+        # Pages are saved and deleted with their specific models as senders,
+        # so connect to each page model rather than to every model
+        for page_model in get_page_models():
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    page_tree_changed,
+                    sender=page_model,
+                    dispatch_uid="wagtail_modeladmin_pages_%s" % page_model._meta.label,
+                )
 
     def user_can_list(self, user):
         """
@@ -168,7 +470,7 @@ class PagePermissionHelper(PermissionHelper):
         added somewhere in the tree essentially determines the add permission,
         rather than actual model-wide permissions
         """
-        return self.get_valid_parent_pages(user).exists()
+        return bool(self.peek_valid_parent_pages(user))
 
     def user_can_edit_obj(self, user, obj):
         perms = obj.permissions_for_user(user)
@@ -185,3 +487,61 @@ class PagePermissionHelper(PermissionHelper):
     def user_can_copy_obj(self, user, obj):
         parent_page = obj.get_parent()
         return parent_page.permissions_for_user(user).can_publish_subpage()
+
+    def get_permissions_for_objs(self, user, objs):
+        """
+        Fetch the data that page permission checks need for all of `objs` at
+        once, before checking each page in turn.
+        """
+        objs = list(objs)
+        self.prefetch_parent_pages(objs)
+        self.prefetch_workflow_states(objs)
+        return super().get_permissions_for_objs(user, objs)
+
+    def prefetch_parent_pages(self, pages):
+        """
+        Fetch the parents of `pages` in a single query, and cache them on each
+        page for `get_parent()` to return.
+        """
+        pages = [
+            page
+            for page in pages
+            if page.depth > 1 and not hasattr(page, "_cached_parent_obj")
+        ]
+        parent_paths = {page.path[: -page.steplen] for page in pages}
+        if not parent_paths:
+            return
+        parents = {
+            parent.path: parent for parent in Page.objects.filter(path__in=parent_paths)
+        }
+        for page in pages:
+            parent = parents.get(page.path[: -page.steplen])
+            if parent is not None:
+                page._cached_parent_obj = parent
+
+    def prefetch_workflow_states(self, pages):
+        """
+        Fetch the active workflow states of `pages`, which are used to check
+        whether each page is locked, in a single query. This mirrors
+        `PageQuerySet.prefetch_workflow_states()` for a list of pages.
+        """
+        if not getattr(settings, "WAGTAIL_WORKFLOW_ENABLED", True):
+            return
+        pages = [
+            page for page in pages if not hasattr(page, "_current_workflow_states")
+        ]
+        if not pages:
+            return
+        relation = "_workflow_states"
+        if type(pages[0]) is not Page:
+            relation = "_specific_workflow_states"
+        prefetch_related_objects(
+            pages,
+            Prefetch(
+                relation,
+                queryset=WorkflowState.objects.active().select_related(
+                    "current_task_state__task"
+                ),
+                to_attr="_current_workflow_states",
+            ),
+        )
@@ -1,7 +1,15 @@
+import hashlib
 import operator
+import re
 from functools import reduce
 
-from django.db.models import Q
+from django.contrib.admin.utils import get_fields_from_path
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import FloatField, IntegerField, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import RawSQL
 from wagtail.search.backends import get_search_backend
 
 try:
@@ -13,10 +21,70 @@ except ImportError:
     )
 
 
+def get_exact_search_field(model, field_path):
+    """
+    Returns the field of ``model`` (or a related model) that ``field_path``,
+    an item in ``ModelAdmin.search_exact_fields``, refers to. Paths may span
+    relations (e.g. "customer__email") and may be or end with "pk". Raises
+    ``FieldDoesNotExist`` if the path isn't to a single field.
+    """
+    *relation_path, field_name = field_path.split(LOOKUP_SEP)
+    if relation_path:
+        related = get_fields_from_path(model, LOOKUP_SEP.join(relation_path))[-1]
+        if not related.is_relation or related.many_to_many or related.one_to_many:
+            raise FieldDoesNotExist(
+                "%s doesn't refer to a single object" % LOOKUP_SEP.join(relation_path)
+            )
+        model = related.related_model
+    opts = model._meta
+    field = opts.pk if field_name == "pk" else opts.get_field(field_name)
+    if field.is_relation:
+        if not field.concrete or not (field.many_to_one or field.one_to_one):
+            raise FieldDoesNotExist("%s doesn't refer to a single value" % field_path)
+        field = field.target_field
+    return field
+
+
 class BaseSearchHandler:
+    # Fields (which may include "pk") to check for an exact match of the
+    # whole search term before searching. Set by ModelAdmin.get_search_handler()
+    # from ModelAdmin.search_exact_fields.
+    exact_fields = ()
+    # Set to "exists" by ModelAdmin.get_search_handler() to search across
+    # multi-valued relations with subqueries, rather than using distinct()
+    relation_filter_mode = "distinct"
+
     def __init__(self, search_fields):
         self.search_fields = search_fields
 
+    def search_exact(self, queryset, search_term):
+        """
+        Returns ``queryset`` filtered to the objects where one of
+        ``exact_fields`` is equal to ``search_term``, or ``None`` if the term
+        isn't a valid value for any of them, or nothing matches. Checking for
+        a match is a single query that can use the fields' indexes, so
+        searches for a primary key or a unique reference skip searching every
+        field of every object.
+        """
+        if not self.exact_fields:
+            return None
+        search_term = search_term.strip()
+        queries = []
+        for field_path in self.exact_fields:
+            field = get_exact_search_field(queryset.model, field_path)
+            try:
+                value = field.to_python(search_term)
+            except ValidationError:
+                continue
+            if value not in (None, ""):
+                queries.append(Q(**{field_path: value}))
+        if not queries:
+            return None
+        queryset = queryset.filter(reduce(operator.or_, queries))
+        if not queryset.exists():
+            return None
+        return queryset
+
     def search_queryset(self, queryset, search_term, **kwargs):
         """
         Returns an iterable of objects from ``queryset`` matching the
@@ -34,20 +102,63 @@ class BaseSearchHandler:
 
 
 class DjangoORMSearchHandler(BaseSearchHandler):
+    # As in django.contrib.admin, a prefix on a field in ``search_fields``
+    # changes the lookup used to search it
+    lookup_prefixes = {
+        "^": "istartswith",
+        "=": "iexact",
+        "@": "search",
+    }
+    default_lookup = "icontains"
+
+    def __init__(self, search_fields):
+        super().__init__(search_fields)
+        self.orm_lookups = [
+            self.construct_search(str(search_field))
+            for search_field in search_fields or ()
+        ]
+
+    def construct_search(self, field_name):
+        """
+        Returns the ORM lookup to use for an item in ``search_fields``.
+        """
+        lookup = self.lookup_prefixes.get(field_name[:1])
+        if lookup:
+            return "%s__%s" % (field_name[1:], lookup)
+        return "%s__%s" % (field_name, self.default_lookup)
+
     def search_queryset(self, queryset, search_term, **kwargs):
         if not search_term or not self.search_fields:
             return queryset
 
-        orm_lookups = [
-            "%s__icontains" % str(search_field) for search_field in self.search_fields
-        ]
+        exact_results = self.search_exact(queryset, search_term)
+        if exact_results is not None:
+            return exact_results
+        return self.search_orm(queryset, search_term)
+
+    def search_orm(self, queryset, search_term):
+        """
+        Returns ``queryset`` filtered to the objects where every word of
+        ``search_term`` matches one of ``search_fields``.
+        """
+        model = queryset.model
+        relation_lookups = {
+            orm_lookup
+            for orm_lookup in self.orm_lookups
+            if lookup_spawns_duplicates(model._meta, orm_lookup)
+        }
+        use_subqueries = self.relation_filter_mode == "exists"
         for bit in search_term.split():
-            or_queries = [Q(**{orm_lookup: bit}) for orm_lookup in orm_lookups]
+            or_queries = []
+            for orm_lookup in self.orm_lookups:
+                if use_subqueries and orm_lookup in relation_lookups:
+                    subquery = model._base_manager.filter(**{orm_lookup: bit})
+                    or_queries.append(Q(pk__in=subquery.values("pk")))
+                else:
+                    or_queries.append(Q(**{orm_lookup: bit}))
             queryset = queryset.filter(reduce(operator.or_, or_queries))
-        opts = queryset.model._meta
-        for search_spec in orm_lookups:
-            if lookup_spawns_duplicates(opts, search_spec):
-                return queryset.distinct()
+        if relation_lookups and not use_subqueries:
+            return queryset.distinct()
         return queryset
 
     @property
@@ -55,8 +166,313 @@ class DjangoORMSearchHandler(BaseSearchHandler):
         return bool(self.search_fields)
 
 
+class DatabaseFullTextSearchHandler(DjangoORMSearchHandler):
+    """
+    Searches ``search_fields`` using the database's own full-text search,
+    which can use an index rather than scanning every row:
+
+    - On PostgreSQL, a ``SearchVector`` of the fields is matched against a
+      ``websearch`` ``SearchQuery``, and results are ranked with
+      ``SearchRank``.
+    - On SQLite, the fields are indexed in an FTS5 table, which (along with
+      triggers that keep it up to date) is created by
+      ``setup_sqlite_index()``, and results are ranked by ``bm25()``. Only
+      fields stored on the model's own table can be indexed this way.
+
+    Results are ordered by rank, unless the user has chosen an ordering.
+    Other databases, and search fields that can't be indexed, fall back to
+    ``DjangoORMSearchHandler``.
+    """
+
+    search_config = None
+    rank_annotation = "search_rank"
+
+    def __init__(self, search_fields):
+        super().__init__(search_fields)
+        # Lookup prefixes don't apply to full-text search
+        self.search_field_names = [
+            str(search_field).lstrip("".join(self.lookup_prefixes))
+            for search_field in search_fields or ()
+        ]
+
+    def search_queryset(self, queryset, search_term, preserve_order=False, **kwargs):
+        if not search_term or not self.search_fields:
+            return queryset
+
+        exact_results = self.search_exact(queryset, search_term)
+        if exact_results is not None:
+            return exact_results
+
+        vendor = connections[queryset.db].vendor
+        if vendor == "postgresql":
+            return self.search_postgresql(queryset, search_term, preserve_order)
+        if vendor == "sqlite":
+            columns = self.get_sqlite_columns(queryset.model)
+            if columns is not None:
+                fts_table = self.get_sqlite_table(queryset.model, columns, queryset.db)
+                if fts_table is not None:
+                    return self.search_sqlite(
+                        queryset, search_term, preserve_order, fts_table
+                    )
+        return self.search_orm(queryset, search_term)
+
+    def order_by_rank(self, queryset, rank_ordering):
+        return queryset.order_by(rank_ordering, *queryset.query.order_by)
+
+    def search_postgresql(self, queryset, search_term, preserve_order):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = SearchVector(*self.search_field_names, config=self.search_config)
+        query = SearchQuery(
+            search_term, search_type="websearch", config=self.search_config
+        )
+        vector_alias = self.rank_annotation + "_vector"
+        queryset = queryset.alias(**{vector_alias: vector}).filter(
+            **{vector_alias: query}
+        )
+        if not preserve_order:
+            queryset = self.order_by_rank(
+                queryset.annotate(**{self.rank_annotation: SearchRank(vector, query)}),
+                "-" + self.rank_annotation,
+            )
+        opts = queryset.model._meta
+        for search_field in self.search_field_names:
+            if lookup_spawns_duplicates(opts, search_field):
+                return queryset.distinct()
+        return queryset
+
+    def get_sqlite_columns(self, model):
+        """
+        Returns the columns of ``model``'s table to index for
+        ``search_fields``, or ``None`` if they can't be indexed by FTS5.
+        """
+        opts = model._meta
+        if not isinstance(opts.pk, IntegerField):
+            return None
+        columns = []
+        for search_field in self.search_field_names:
+            try:
+                field = opts.get_field(search_field)
+            except FieldDoesNotExist:
+                return None
+            if field.is_relation or not field.concrete or field.model is not model:
+                return None
+            columns.append(field.column)
+        return columns
+
+    def get_sqlite_table_name(self, model, columns):
+        return "%s_fts_%s" % (
+            model._meta.db_table,
+            hashlib.md5(",".join(columns).encode()).hexdigest()[:8],
+        )
+
+    def get_sqlite_table(self, model, columns, using):
+        """
+        Returns the name of the FTS5 table indexing ``columns`` of ``model``,
+        or ``None`` if ``setup_sqlite_index()`` hasn't created it.
+        """
+        fts_table = self.get_sqlite_table_name(model, columns)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [fts_table],
+            )
+            if cursor.fetchone():
+                return fts_table
+        return None
+
+    def setup_sqlite_index(self, model, using=DEFAULT_DB_ALIAS):
+        """
+        Creates the FTS5 table indexing ``search_fields`` of ``model`` on
+        SQLite, along with the triggers that keep it up to date, and removes
+        any tables left behind for other ``search_fields``. Run this from a
+        migration (or a management command) whenever ``search_fields``
+        change; searches fall back to ``DjangoORMSearchHandler`` until it
+        has been run.
+
+        Returns the name of the table, or ``None`` if ``search_fields`` can't
+        be indexed this way.
+        """
+        connection = connections[using]
+        if connection.vendor != "sqlite":
+            return None
+        columns = self.get_sqlite_columns(model)
+        if columns is None:
+            return None
+
+        fts_table = self.get_sqlite_table_name(model, columns)
+        db_table = model._meta.db_table
+        qn = connection.ops.quote_name
+        pk = qn(model._meta.pk.column)
+        cols = ", ".join(qn(column) for column in columns)
+        new_cols = ", ".join("new.%s" % qn(column) for column in columns)
+        old_cols = ", ".join("old.%s" % qn(column) for column in columns)
+        delete = "INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old_cols});"
+        insert = "INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new_cols});"
+        with transaction.atomic(using=using):
+            self.remove_sqlite_index(model, using, keep=fts_table)
+            with connection.cursor() as cursor:
+                for sql in (
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content={table}, content_rowid={pk})",
+                    "CREATE TRIGGER IF NOT EXISTS {ai} AFTER INSERT ON {table} BEGIN "
+                    + insert
+                    + " END",
+                    "CREATE TRIGGER IF NOT EXISTS {ad} AFTER DELETE ON {table} BEGIN "
+                    + delete
+                    + " END",
+                    "CREATE TRIGGER IF NOT EXISTS {au} AFTER UPDATE ON {table} BEGIN "
+                    + delete
+                    + " "
+                    + insert
+                    + " END",
+                    "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+                ):
+                    cursor.execute(
+                        sql.format(
+                            fts=qn(fts_table),
+                            table=qn(db_table),
+                            pk=pk,
+                            cols=cols,
+                            new_cols=new_cols,
+                            old_cols=old_cols,
+                            ai=qn(fts_table + "_ai"),
+                            ad=qn(fts_table + "_ad"),
+                            au=qn(fts_table + "_au"),
+                        )
+                    )
+        return fts_table
+
+    def remove_sqlite_index(self, model, using=DEFAULT_DB_ALIAS, keep=None):
+        """
+        Drops the FTS5 tables created by ``setup_sqlite_index()`` for
+        ``model`` (except ``keep``), along with their triggers, e.g. to
+        reverse a migration that set them up.
+        """
+        connection = connections[using]
+        if connection.vendor != "sqlite":
+            return
+        qn = connection.ops.quote_name
+        pattern = re.compile(r"^%s_fts_[0-9a-f]{8}$" % re.escape(model._meta.db_table))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND sql LIKE 'CREATE VIRTUAL TABLE%'"
+            )
+            tables = [
+                name
+                for (name,) in cursor.fetchall()
+                if pattern.match(name) and name != keep
+            ]
+            for fts_table in tables:
+                for suffix in ("_ai", "_ad", "_au"):
+                    cursor.execute("DROP TRIGGER IF EXISTS %s" % qn(fts_table + suffix))
+                cursor.execute("DROP TABLE IF EXISTS %s" % qn(fts_table))
+
+    def search_sqlite(self, queryset, search_term, preserve_order, fts_table):
+        model = queryset.model
+        qn = connections[queryset.db].ops.quote_name
+        fts_table = qn(fts_table)
+        # Match every word, as a prefix, treating any FTS5 syntax literally
+        match = " ".join(
+            '"%s"*' % bit.replace('"', '""') for bit in search_term.split()
+        )
+        rank = RawSQL(
+            "SELECT bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {table}.{pk}".format(
+                fts=fts_table,
+                table=qn(model._meta.db_table),
+                pk=qn(model._meta.pk.column),
+            ),
+            [match],
+            output_field=FloatField(),
+        )
+        queryset = queryset.filter(
+            pk__in=RawSQL(
+                "SELECT rowid FROM {fts} WHERE {fts} MATCH %s".format(fts=fts_table),
+                [match],
+            )
+        )
+        if preserve_order:
+            return queryset
+        # bm25() scores are negative, with the best matches lowest
+        return self.order_by_rank(
+            queryset.annotate(**{self.rank_annotation: rank}), self.rank_annotation
+        )
+
+
+class CachedSearchResults:
+    """
+    The results of a search, as the list of primary keys of the matching
+    objects in ranked order. Slicing fetches only the objects in the slice
+    from ``queryset``, so paging through the results doesn't search again.
+
+    If only the first of ``count`` results were cached, slices reaching
+    past them are fetched by calling ``search()`` to search again.
+    """
+
+    def __init__(self, queryset, pks, count=None, search=None):
+        self.queryset = queryset
+        self.pks = pks
+        self.total = len(pks) if count is None else count
+        self.search = search
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            try:
+                return self[key : key + 1 or None][0]
+            except IndexError:
+                raise IndexError("Search result index out of range")
+        start, stop, step = key.indices(self.total)
+        if stop > len(self.pks) and self.search is not None:
+            return list(self.search()[key])
+        pks = self.pks[key]
+        objects = self.queryset.in_bulk(pks)
+        # Objects deleted since the search was cached are left out
+        return [objects[pk] for pk in pks if pk in objects]
+
+
 class WagtailBackendSearchHandler(BaseSearchHandler):
     default_search_backend = "default"
+    # Set by ModelAdmin.get_search_handler() from
+    # ModelAdmin.search_results_cache_timeout
+    cache_timeout = 0
+    cache_max_results = 1000
+    cache_prefix = "wagtail_modeladmin:search"
+
+    def get_cache_key(
+        self, queryset, search_term, operator, backend, order_by_relevance
+    ):
+        """
+        Returns the key to cache the results of a search under, which
+        includes the SQL of ``queryset`` so that results for different
+        filters are cached separately, or ``None`` if the results can't be
+        cached.
+        """
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        key = repr(
+            (
+                queryset.model._meta.label,
+                search_term,
+                operator,
+                backend,
+                self.search_fields,
+                order_by_relevance,
+                sql,
+                params,
+            )
+        )
+        return "%s:%s" % (self.cache_prefix, hashlib.md5(key.encode()).hexdigest())
 
     def search_queryset(
         self,
@@ -70,11 +486,48 @@ class WagtailBackendSearchHandler(BaseSearchHandler):
         if not search_term:
             return queryset
 
-        backend = get_search_backend(backend or self.default_search_backend)
-        return backend.search(
-            search_term,
-            queryset,
-            fields=self.search_fields or None,
-            operator=operator,
-            order_by_relevance=not preserve_order,
+        exact_results = self.search_exact(queryset, search_term)
+        if exact_results is not None:
+            return exact_results
+
+        backend = backend or self.default_search_backend
+
+        def search(queryset):
+            return get_search_backend(backend).search(
+                search_term,
+                queryset,
+                fields=self.search_fields or None,
+                operator=operator,
+                order_by_relevance=not preserve_order,
+            )
+
+        cache_key = None
+        if self.cache_timeout:
+            cache_key = self.get_cache_key(
+                queryset, search_term, operator, backend, not preserve_order
+            )
+        if not cache_key:
+            return search(queryset)
+
+        cached = cache.get(cache_key)
+        if cached is None:
+            # Only the primary keys are needed, and one more than can be
+            # cached is fetched to find out whether there are more results
+            pk_results = search(
+                queryset.select_related(None)
+                .prefetch_related(None)
+                .only(queryset.model._meta.pk.attname)
+            )
+            pks = [obj.pk for obj in pk_results[: self.cache_max_results + 1]]
+            if len(pks) > self.cache_max_results:
+                # Cache the first results, and how many there are in total
+                pks = pks[: self.cache_max_results]
+                count = pk_results.count()
+            else:
+                count = len(pks)
+            cached = (pks, count)
+            cache.set(cache_key, cached, self.cache_timeout)
+        pks, count = cached
+        return CachedSearchResults(
+            queryset, pks, count, search=lambda: search(queryset)
         )
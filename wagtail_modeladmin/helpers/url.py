@@ -1,15 +1,24 @@
+import re
 from urllib.parse import quote
 
 from django.contrib.admin.utils import quote as admin_quote
-from django.urls import reverse
+from django.urls import NoReverseMatch, get_script_prefix, get_urlconf, reverse
 from django.utils.functional import cached_property
+from django.utils.translation import get_language
 
 
 class AdminURLHelper:
+    # Object-specific URLs are reversed once with a placeholder in place of
+    # the primary key, and then filled in for each object. Primary keys that
+    # don't match `url_pk_regex` are always reversed.
+    url_pk_placeholder = "__pk__"
+    url_pk_regex = re.compile(r"[-\w]+", re.ASCII)
+
     def __init__(self, model, base_url_path=None):
         self.model = model
         self.opts = model._meta
         self.base_url_path = self._get_base_url_path(base_url_path)
+        self._url_templates = {}
 
     def _get_base_url_path(self, base_url_path):
         if base_url_path:
@@ -28,8 +37,12 @@ class AdminURLHelper:
         )
 
     def get_action_url_pattern(self, action):
-        if action in ("create", "choose_parent", "index"):
+        if action in ("create", "choose_parent", "index", "search_suggestions"):
             return self._get_action_url_pattern(action)
+        if action == "export":
+            return r"^%s/%s/(?P<job_id>[0-9a-f]+)/$" % (self.base_url_path, action)
+        if action == "filter_choices":
+            return r"^%s/%s/(?P<field_path>\w+)/$" % (self.base_url_path, action)
         return self._get_object_specific_action_url_pattern(action)
 
     def get_action_url_name(self, action):
@@ -39,11 +52,46 @@ class AdminURLHelper:
         )
 
     def get_action_url(self, action, *args, **kwargs):
-        if action in ("create", "choose_parent", "index"):
+        if action in ("create", "choose_parent", "index", "search_suggestions"):
             return reverse(self.get_action_url_name(action))
         url_name = self.get_action_url_name(action)
+        if len(args) == 1 and not kwargs:
+            return self.reverse_with_pk(url_name, args[0])
         return reverse(url_name, args=args, kwargs=kwargs)
 
+    def get_url_template(self, url_name):
+        """
+        Return the URL for `url_name` split around its primary key, reversing
+        it on first use for each URL configuration, script prefix and
+        language, or `None` if it can't be split.
+        """
+        key = (url_name, get_urlconf(), get_script_prefix(), get_language())
+        try:
+            return self._url_templates[key]
+        except KeyError:
+            pass
+        placeholder = self.url_pk_placeholder
+        try:
+            url = reverse(url_name, args=[placeholder])
+        except NoReverseMatch:
+            template = None
+        else:
+            template = url.split(placeholder) if url.count(placeholder) == 1 else None
+        self._url_templates[key] = template
+        return template
+
+    def reverse_with_pk(self, url_name, pk):
+        """
+        Return the URL for `url_name` for the (already quoted) `pk`, filling
+        in a URL template instead of calling `reverse()` where possible.
+        """
+        pk = str(pk)
+        if self.url_pk_regex.fullmatch(pk):
+            template = self.get_url_template(url_name)
+            if template is not None:
+                return pk.join(template)
+        return reverse(url_name, args=[pk])
+
     @cached_property
     def index_url(self):
         return self.get_action_url("index")
@@ -67,9 +115,20 @@ class ModelAdminURLFinder:
 
 
 class PageAdminURLHelper(AdminURLHelper):
+    # Wagtail's page URLs only accept integer ids
+    url_pk_placeholder = "999999999"
+    url_pk_regex = re.compile(r"[0-9]+")
+
+    @cached_property
+    def quoted_index_url(self):
+        return quote(self.index_url)
+
     def get_action_url(self, action, *args, **kwargs):
         if action in ("add", "edit", "delete", "unpublish", "copy", "history"):
             url_name = "wagtailadmin_pages:%s" % action
-            target_url = reverse(url_name, args=args, kwargs=kwargs)
-            return "%s?next=%s" % (target_url, quote(self.index_url))
+            if len(args) == 1 and not kwargs:
+                target_url = self.reverse_with_pk(url_name, args[0])
+            else:
+                target_url = reverse(url_name, args=args, kwargs=kwargs)
+            return "%s?next=%s" % (target_url, self.quoted_index_url)
         return super().get_action_url(action, *args, **kwargs)
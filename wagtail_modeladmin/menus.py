@@ -1,5 +1,92 @@
+import hashlib
+
+from django.conf import settings
 from wagtail.admin.menu import MenuItem, SubmenuMenuItem
 
+from .helpers.permission import get_permissions_generation
+
+
+class MenuVisibilityResolver:
+    """
+    Works out which ModelAdmin menu items a user can see, for every menu
+    item at once, the first time any of them is checked in a request.
+
+    When the ``WAGTAIL_MODELADMIN_CACHE_MENU_VISIBILITY`` setting is
+    ``True``, the result is also stored in the user's session, until the
+    permissions of a user or group, or the groups of a user, change.
+    """
+
+    session_key = "wagtail_modeladmin_menu_visibility"
+
+    def __init__(self):
+        self.model_admins = {}
+
+    def get_key(self, model_admin):
+        return model_admin.url_helper.get_action_url_name("index")
+
+    def register(self, model_admin):
+        self.model_admins[self.get_key(model_admin)] = model_admin
+
+    def resolve(self, user):
+        """
+        Return the set of keys of the ModelAdmins whose listings `user` can
+        access.
+        """
+        return {
+            key
+            for key, model_admin in self.model_admins.items()
+            if model_admin.permission_helper.user_can_list(user)
+        }
+
+    def get_state(self, user):
+        """
+        Return what the visible menu items stored in a session depend on,
+        other than the permissions themselves.
+        """
+        registered = ",".join(sorted(self.model_admins))
+        return [
+            get_permissions_generation(),
+            str(user.pk),
+            user.is_active,
+            getattr(user, "is_superuser", False),
+            hashlib.md5(registered.encode()).hexdigest(),
+        ]
+
+    def get_visible(self, request):
+        try:
+            return request._modeladmin_visible_menu_items
+        except AttributeError:
+            pass
+
+        session = getattr(request, "session", None)
+        if not getattr(settings, "WAGTAIL_MODELADMIN_CACHE_MENU_VISIBILITY", False):
+            session = None
+
+        visible = None
+        if session is not None:
+            state = self.get_state(request.user)
+            cached = session.get(self.session_key)
+            if cached and cached["state"] == state:
+                visible = set(cached["visible"])
+        if visible is None:
+            visible = self.resolve(request.user)
+            if session is not None:
+                session[self.session_key] = {
+                    "state": state,
+                    "visible": sorted(visible),
+                }
+        request._modeladmin_visible_menu_items = visible
+        return visible
+
+    def is_shown(self, request, model_admin):
+        key = self.get_key(model_admin)
+        if self.model_admins.get(key) is not model_admin:
+            return model_admin.permission_helper.user_can_list(request.user)
+        return key in self.get_visible(request)
+
+
+menu_visibility = MenuVisibilityResolver()
+
 
 class ModelAdminMenuItem(MenuItem):
     """
@@ -9,6 +96,7 @@ class ModelAdminMenuItem(MenuItem):
 
     def __init__(self, model_admin, order):
         self.model_admin = model_admin
+        menu_visibility.register(model_admin)
         url = model_admin.url_helper.index_url
         menu_icon = model_admin.get_menu_icon()
         if menu_icon[:3] == "fa-":
@@ -27,7 +115,7 @@ class ModelAdminMenuItem(MenuItem):
         )
 
     def is_shown(self, request):
-        return self.model_admin.permission_helper.user_can_list(request.user)
+        return menu_visibility.is_shown(request, self.model_admin)
 
 
 class GroupMenuItem(SubmenuMenuItem):
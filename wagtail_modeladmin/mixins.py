@@ -28,6 +28,14 @@ class ThumbnailMixin:
         self.__class__.admin_thumb.short_description = self.thumb_col_header_text
         super().__init__(*args, **kwargs)
 
+    def get_list_only_fields(self, request):
+        only_fields = super().get_list_only_fields(request)
+        if only_fields is True:
+            return (self.thumb_image_field_name,)
+        if only_fields:
+            return tuple(only_fields) + (self.thumb_image_field_name,)
+        return only_fields
+
     def admin_thumb(self, obj):
         try:
             image = getattr(obj, self.thumb_image_field_name, None)
@@ -1,9 +1,10 @@
 from django.conf import settings
 from django.contrib.admin import site as default_django_admin_site
+from django.contrib.admin.utils import NotRelationField, get_fields_from_path
 from django.contrib.auth.models import Permission
 from django.core import checks
-from django.core.exceptions import ImproperlyConfigured
-from django.db.models import Model
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Field, Model
 from django.urls import re_path
 from django.utils.safestring import mark_safe
 from wagtail import hooks
@@ -13,6 +14,7 @@ from wagtail.admin.menu import Menu
 from wagtail.admin.panels import ObjectList, extract_panel_definitions_from_model_class
 from wagtail.models import Page, ReferenceIndex, TranslatableMixin
 
+from .filters import LazyRelatedFieldListFilter
 from .helpers import (
     AdminURLHelper,
     ButtonHelper,
@@ -23,6 +25,7 @@ from .helpers import (
     PagePermissionHelper,
     PermissionHelper,
 )
+from .helpers.search import get_exact_search_field
 from .menus import GroupMenuItem, ModelAdminMenuItem
 from .mixins import ThumbnailMixin  # NOQA: F401
 from .views import (
@@ -30,9 +33,12 @@ from .views import (
     CreateView,
     DeleteView,
     EditView,
+    ExportStatusView,
+    FilterChoicesView,
     HistoryView,
     IndexView,
     InspectView,
+    SearchSuggestionsView,
 )
 
 
@@ -83,12 +89,22 @@ class WagtailRegisterable:
 
         self.register_indexing()
 
+        self.register_list_filter_cache_invalidation()
+
+        self.register_permission_cache_invalidation()
+
     def register_admin_url_finders(self):
         pass
 
     def register_indexing(self):
         pass
 
+    def register_list_filter_cache_invalidation(self):
+        pass
+
+    def register_permission_cache_invalidation(self):
+        pass
+
     def will_modify_explorer_page_queryset(self):
         return False
 
@@ -110,15 +126,31 @@ class ModelAdmin(WagtailRegisterable):
     list_display = ("__str__",)
     list_display_add_buttons = None
     list_export = ()
+    export_chunk_size = 2000
+    export_in_background = False
     inspect_view_fields = []
     inspect_view_fields_exclude = []
     inspect_view_enabled = False
     history_view_enabled = True
     empty_value_display = "-"
     list_filter = ()
+    show_facets = False
+    facets_cache_timeout = 0
     list_select_related = False
+    list_prefetch_related = ()
+    list_only_fields = False
+    single_pass_result_list = False
+    stream_index_view = False
     list_per_page = 100
+    pagination_mode = "offset"
+    result_count_mode = "exact"
+    result_count_cap = 1000
+    relation_filter_mode = "distinct"
     search_fields = None
+    search_exact_fields = ()
+    search_results_cache_timeout = 0
+    search_suggestions_limit = 10
+    search_suggestions_cache_timeout = 0
     ordering = None
     parent = None
     prepopulated_fields = {}
@@ -129,6 +161,9 @@ class ModelAdmin(WagtailRegisterable):
     delete_view_class = DeleteView
     history_view_class = HistoryView
     choose_parent_view_class = ChooseParentView
+    export_status_view_class = ExportStatusView
+    filter_choices_view_class = FilterChoicesView
+    search_suggestions_view_class = SearchSuggestionsView
     index_template_name = ""
     create_template_name = ""
     edit_template_name = ""
@@ -136,6 +171,7 @@ class ModelAdmin(WagtailRegisterable):
     delete_template_name = ""
     history_template_name = ""
     choose_parent_template_name = ""
+    export_status_template_name = ""
     search_handler_class = DjangoORMSearchHandler
     extra_search_kwargs = {}
     permission_helper_class = None
@@ -258,6 +294,14 @@ class ModelAdmin(WagtailRegisterable):
         """
         return self.list_export
 
+    def get_list_only_fields(self, request):
+        """
+        Return ``False`` to load every field of the objects in the list view,
+        or ``True`` (or a sequence of additional field names to load) to load
+        only the fields the listing is known to need.
+        """
+        return self.list_only_fields
+
     def get_empty_value_display(self, field_name=None):
         """
         Return the empty_value_display value defined on ModelAdmin
@@ -313,9 +357,24 @@ class ModelAdmin(WagtailRegisterable):
         Returns an instance of ``self.search_handler_class`` that can be used by
         ``IndexView``.
         """
-        return self.search_handler_class(
+        search_handler = self.search_handler_class(
             search_fields or self.get_search_fields(request)
         )
+        search_exact_fields = self.get_search_exact_fields(request)
+        if search_exact_fields:
+            search_handler.exact_fields = search_exact_fields
+        if self.relation_filter_mode != "distinct":
+            search_handler.relation_filter_mode = self.relation_filter_mode
+        if self.search_results_cache_timeout:
+            search_handler.cache_timeout = self.search_results_cache_timeout
+        return search_handler
+
+    def get_search_exact_fields(self, request):
+        """
+        Returns a sequence of fields (which may include "pk") to check for an
+        exact match of the whole search term, before searching as normal.
+        """
+        return self.search_exact_fields
 
     def get_extra_search_kwargs(self, request, search_term):
         """
@@ -472,6 +531,38 @@ class ModelAdmin(WagtailRegisterable):
         view_class = self.history_view_class
         return view_class.as_view(**kwargs)(request)
 
+    def export_status_view(self, request, job_id):
+        """
+        Instantiates a class-based view to report on the progress of a
+        background export, and to download the file once it's complete. The
+        view class used can be overridden by changing the
+        'export_status_view_class' attribute.
+        """
+        kwargs = {"model_admin": self, "job_id": job_id}
+        view_class = self.export_status_view_class
+        return view_class.as_view(**kwargs)(request)
+
+    def filter_choices_view(self, request, field_path):
+        """
+        Instantiates a class-based view to return the choices matching a
+        search for a `LazyRelatedFieldListFilter` in `list_filter` as JSON.
+        The view class used can be overridden by changing the
+        'filter_choices_view_class' attribute.
+        """
+        kwargs = {"model_admin": self, "field_path": field_path}
+        view_class = self.filter_choices_view_class
+        return view_class.as_view(**kwargs)(request)
+
+    def search_suggestions_view(self, request):
+        """
+        Instantiates a class-based view to return the objects best matching a
+        search as JSON. The view class used can be overridden by changing the
+        'search_suggestions_view_class' attribute.
+        """
+        kwargs = {"model_admin": self}
+        view_class = self.search_suggestions_view_class
+        return view_class.as_view(**kwargs)(request)
+
     def get_edit_handler(self):
         """
         Returns the appropriate edit_handler for this modeladmin class.
@@ -563,6 +654,15 @@ class ModelAdmin(WagtailRegisterable):
         """
         return self.edit_template_name or self.get_templates("edit")
 
+    def get_export_status_template(self):
+        """
+        Returns a template to be used when rendering 'export_status_view'. If
+        a template is specified by the 'export_status_template_name'
+        attribute, that will be used. Otherwise, a list of preferred template
+        names are returned.
+        """
+        return self.export_status_template_name or self.get_templates("export_status")
+
     def get_delete_template(self):
         """
         Returns a template to be used when rendering 'delete_view'. If
@@ -618,6 +718,23 @@ class ModelAdmin(WagtailRegisterable):
                 self.delete_view,
                 name=self.url_helper.get_action_url_name("delete"),
             ),
+            re_path(
+                self.url_helper.get_action_url_pattern("search_suggestions"),
+                self.search_suggestions_view,
+                name=self.url_helper.get_action_url_name("search_suggestions"),
+            ),
+            # get_list_export() and get_list_filter() can vary by request, so
+            # these views return a 404 when there is nothing to serve
+            re_path(
+                self.url_helper.get_action_url_pattern("export"),
+                self.export_status_view,
+                name=self.url_helper.get_action_url_name("export"),
+            ),
+            re_path(
+                self.url_helper.get_action_url_pattern("filter_choices"),
+                self.filter_choices_view,
+                name=self.url_helper.get_action_url_name("filter_choices"),
+            ),
         )
         if self.inspect_view_enabled:
             urls = urls + (
@@ -661,6 +778,55 @@ class ModelAdmin(WagtailRegisterable):
             errors = check_panels_in_model(self.model, "modeladmin")
             return errors
 
+        @checks.register()
+        def modeladmin_search_exact_fields_check(app_configs, **kwargs):
+            return self.check_search_exact_fields()
+
+    def check_search_exact_fields(self):
+        """
+        Returns a list of errors for any items in `search_exact_fields` that
+        aren't paths to a single field.
+        """
+        errors = []
+        for field_path in self.search_exact_fields:
+            try:
+                get_exact_search_field(self.model, field_path)
+            except (FieldDoesNotExist, NotRelationField):
+                errors.append(
+                    checks.Error(
+                        "%s.search_exact_fields refers to '%s', which is not a "
+                        "field of %s or a related model that has one value per "
+                        "object." % (type(self).__name__, field_path, self.opts.label),
+                        obj=type(self),
+                        id="wagtail_modeladmin.E001",
+                    )
+                )
+        return errors
+
+    def register_list_filter_cache_invalidation(self):
+        """
+        Connect the signals that clear the cached choices of any
+        `LazyRelatedFieldListFilter` in `list_filter` when the related
+        objects change.
+        """
+        for list_filter in self.list_filter:
+            if not isinstance(list_filter, (tuple, list)):
+                continue
+            field, filter_class = list_filter
+            if isinstance(filter_class, type) and issubclass(
+                filter_class, LazyRelatedFieldListFilter
+            ):
+                if not isinstance(field, Field):
+                    field = get_fields_from_path(self.model, field)[-1]
+                filter_class.register_cache_invalidation(field)
+
+    def register_permission_cache_invalidation(self):
+        """
+        Connect the signals that invalidate permissions cached by the
+        permission helper between requests.
+        """
+        self.permission_helper.register_cache_invalidation()
+
     def register_admin_url_finders(self):
         if not self.is_pagemodel:
             finder_class = type(
@@ -787,6 +953,14 @@ class ModelAdminGroup(WagtailRegisterable):
         for instance in self.modeladmin_instances:
             instance.register_indexing()
 
+    def register_list_filter_cache_invalidation(self):
+        for instance in self.modeladmin_instances:
+            instance.register_list_filter_cache_invalidation()
+
+    def register_permission_cache_invalidation(self):
+        for instance in self.modeladmin_instances:
+            instance.register_permission_cache_invalidation()
+
 
 def modeladmin_register(modeladmin_class):
     """
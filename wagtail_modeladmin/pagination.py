@@ -0,0 +1,405 @@
+import datetime
+import decimal
+import json
+import uuid
+
+from django.contrib.admin.utils import get_fields_from_path
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+from wagtail.admin.paginator import WagtailPaginator
+
+
+class ResultCount(int):
+    """
+    The number of results in a listing, which may be a lower bound (when
+    counting stopped at a cap) or an estimate from the database's query
+    planner, rather than an exact count.
+    """
+
+    def __new__(cls, value, exact=True, estimated=False):
+        obj = super().__new__(cls, value)
+        obj.exact = exact
+        obj.estimated = estimated
+        return obj
+
+    def __str__(self):
+        if self.exact:
+            return str(int(self))
+        if self.estimated:
+            return _("about %(count)s") % {"count": int(self)}
+        return _("more than %(count)s") % {"count": int(self)}
+
+
+def estimate_count(queryset):
+    """
+    Return the query planner's estimate of the number of rows in
+    ``queryset``, or ``None`` if the database doesn't provide one.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_result_count(queryset, mode="exact", cap=1000):
+    """
+    Count the results in ``queryset`` according to ``mode``:
+
+    * 'exact' runs a full ``COUNT(*)``.
+    * 'capped' stops counting after ``cap`` rows, returning a lower bound for
+      larger result sets.
+    * 'estimated' works like 'capped', but uses the query planner's estimate
+      for larger result sets where the database provides one (PostgreSQL).
+    """
+    if mode == "exact" or not isinstance(queryset, QuerySet):
+        return ResultCount(queryset.count())
+    count = queryset.order_by()[: cap + 1].count()
+    if count <= cap:
+        return ResultCount(count)
+    if mode == "estimated":
+        estimate = estimate_count(queryset)
+        if estimate is not None:
+            return ResultCount(max(estimate, cap + 1), exact=False, estimated=True)
+    return ResultCount(cap, exact=False)
+
+
+class CursorJSONEncoder(json.JSONEncoder):
+    """
+    Serialises the ordering values stored in a keyset cursor. Unlike
+    ``DjangoJSONEncoder``, datetimes keep their full precision, so that
+    seeking past a row never skips or repeats its neighbours.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, (decimal.Decimal, uuid.UUID)):
+            return str(o)
+        return super().default(o)
+
+
+class CursorSerializer(signing.JSONSerializer):
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), cls=CursorJSONEncoder).encode(
+            "latin-1"
+        )
+
+
+class UncountedPage(Page):
+    """
+    A page of results where whether there are neighbouring pages is
+    determined by the rows that were fetched, rather than by comparing the
+    page number against a total count.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next, has_previous):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class KeysetPage(UncountedPage):
+    """
+    A page of results produced by ``KeysetPaginator``, with the cursors
+    needed to fetch its neighbours.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        number,
+        paginator,
+        has_next=False,
+        has_previous=False,
+        next_cursor=None,
+        previous_cursor=None,
+    ):
+        super().__init__(object_list, number, paginator, has_next, has_previous)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+
+class ListingPaginator(WagtailPaginator):
+    """
+    A paginator that can be given the number of results up front (e.g. a
+    ``ResultCount`` already computed for the listing) rather than counting
+    them again. When that count is not exact, the total number of pages is
+    unknown, and whether there is a next page is found by fetching one row
+    more than is displayed.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+    @cached_property
+    def num_pages(self):
+        if not getattr(self.count, "exact", True):
+            return None
+        return super().num_pages
+
+    @cached_property
+    def items_count_label(self):
+        if self.count == 1:
+            return "1 %s" % self.verbose_name
+        return "%s %s" % (self.count, self.verbose_name_plural)
+
+    def validate_number(self, number):
+        if self.num_pages is not None:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def get_elided_page_range(self, page_number):
+        if self.num_pages is None:
+            return []
+        return super().get_elided_page_range(page_number)
+
+    def page(self, number):
+        if self.num_pages is not None:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        return UncountedPage(
+            rows[: self.per_page],
+            number,
+            self,
+            has_next=len(rows) > self.per_page,
+            has_previous=number > 1,
+        )
+
+
+class KeysetPaginator(ListingPaginator):
+    """
+    Paginates a queryset by seeking past the boundary row of the previous
+    page (``WHERE (a, b, pk) > (...)``), rather than with ``OFFSET``, so that
+    deep pages cost the same to fetch as the first one.
+
+    ``ordering`` must be a sequence of field paths (optionally prefixed with
+    '-') that ends with a unique field, such as the list returned by
+    ``IndexView.get_ordering()``. A ``ValueError`` is raised for orderings
+    that cannot be expressed as a keyset, such as random ordering,
+    expressions or annotations.
+    """
+
+    cursor_salt = "wagtail_modeladmin.pagination.KeysetPaginator"
+    annotation_prefix = "_modeladmin_keyset_"
+
+    def __init__(self, object_list, per_page, ordering, count=None, **kwargs):
+        self.keys = self.get_keys(object_list.model, ordering)
+        super().__init__(object_list, per_page, count=count, **kwargs)
+
+    def get_keys(self, model, ordering):
+        """
+        Return a list of ``(path, descending, nullable)`` tuples describing
+        each item in ``ordering``.
+        """
+        keys = []
+        seen = set()
+        for item in ordering:
+            if not isinstance(item, str) or item == "?":
+                raise ValueError("Cannot paginate by keyset on %r" % (item,))
+            descending = item.startswith("-")
+            path = item.lstrip("-")
+            if path == "pk":
+                path = model._meta.pk.name
+            try:
+                fields = get_fields_from_path(model, path)
+            except (FieldDoesNotExist, LookupError) as e:
+                raise ValueError("Cannot paginate by keyset on %r" % item) from e
+            field = fields[-1]
+            if field.many_to_one or field.one_to_one:
+                # Relations are ordered by their key, rather than by the
+                # related model's default ordering
+                if not field.concrete:
+                    raise ValueError("Cannot paginate by keyset on %r" % item)
+                path = LOOKUP_SEP.join(path.split(LOOKUP_SEP)[:-1] + [field.attname])
+            elif field.is_relation:
+                raise ValueError("Cannot paginate by keyset on %r" % item)
+            if path in seen:
+                continue
+            seen.add(path)
+            nullable = any(getattr(f, "null", False) for f in fields)
+            keys.append((path, descending, nullable))
+        if not keys:
+            raise ValueError("Cannot paginate by keyset without an ordering")
+        return keys
+
+    def get_order_by(self, reverse=False):
+        order_by = []
+        for path, descending, nullable in self.keys:
+            descending = descending != reverse
+            if not nullable:
+                order_by.append("-" + path if descending else path)
+            elif descending:
+                order_by.append(F(path).desc(nulls_first=True))
+            else:
+                order_by.append(F(path).asc(nulls_last=True))
+        return order_by
+
+    def get_seek_filter(self, values, reverse=False):
+        """
+        Return a ``Q`` object matching the rows that come after ``values`` in
+        the ordering (or before them, when ``reverse`` is ``True``). NULLs are
+        treated as larger than any other value.
+        """
+        clauses = []
+        preceding = Q()
+        for (path, descending, nullable), value in zip(self.keys, values):
+            descending = descending != reverse
+            if value is None:
+                after = Q(**{path + "__isnull": False}) if descending else None
+                equal = Q(**{path + "__isnull": True})
+            else:
+                lookup = "__lt" if descending else "__gt"
+                after = Q(**{path + lookup: value})
+                if nullable and not descending:
+                    after |= Q(**{path + "__isnull": True})
+                equal = Q(**{path: value})
+            if after is not None:
+                clauses.append(preceding & after)
+            preceding &= equal
+        if not clauses:
+            return Q(pk__in=[])
+        combined = clauses[0]
+        for clause in clauses[1:]:
+            combined |= clause
+        return combined
+
+    def get_cursor_keys(self):
+        """
+        Return a description of the ordering that is signed into each
+        cursor, so that cursors aren't used with a different ordering.
+        """
+        return [
+            self.object_list.model._meta.label,
+            [[path, descending] for path, descending, nullable in self.keys],
+        ]
+
+    def encode_cursor(self, number, values, reverse=False):
+        return signing.dumps(
+            [number, values, reverse, self.get_cursor_keys()],
+            salt=self.cursor_salt,
+            serializer=CursorSerializer,
+            compress=True,
+        )
+
+    def decode_cursor(self, cursor):
+        """
+        Return a ``(number, values, reverse)`` tuple for the supplied cursor,
+        or ``None`` if the cursor is missing, has been tampered with or no
+        longer fits the current ordering.
+        """
+        if not cursor:
+            return None
+        try:
+            number, values, reverse, keys = signing.loads(
+                cursor, salt=self.cursor_salt, serializer=CursorSerializer
+            )
+        except (signing.BadSignature, TypeError, ValueError):
+            return None
+        if keys != self.get_cursor_keys():
+            return None
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            return None
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            return None
+        return number, values, bool(reverse)
+
+    def get_elided_page_range(self, page_number):
+        # Keyset pages can only be reached by stepping from a neighbour
+        return []
+
+    def page(self, cursor=None):
+        position = self.decode_cursor(cursor)
+        if position is None:
+            number, values, reverse = 1, None, False
+        else:
+            number, values, reverse = position
+
+        annotations = {
+            "%s%d" % (self.annotation_prefix, i): F(path)
+            for i, (path, descending, nullable) in enumerate(self.keys)
+        }
+        queryset = self.object_list.annotate(**annotations).order_by(
+            *self.get_order_by(reverse)
+        )
+        if values is not None:
+            try:
+                queryset = queryset.filter(self.get_seek_filter(values, reverse))
+            except (ValidationError, ValueError, TypeError):
+                # The values don't fit the fields they're ordered by
+                return self.page()
+
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if reverse:
+            if not has_more:
+                # We've stepped back onto the first page, which may not be a
+                # full one if rows were added since the cursor was issued
+                return self.page()
+            rows.reverse()
+            has_next, has_previous = True, True
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_next:
+                next_cursor = self.encode_cursor(
+                    number + 1, self.get_row_values(rows[-1], annotations)
+                )
+            if has_previous:
+                previous_cursor = self.encode_cursor(
+                    number - 1, self.get_row_values(rows[0], annotations), True
+                )
+
+        return KeysetPage(
+            rows,
+            number,
+            self,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+        )
+
+    def get_row_values(self, row, annotations):
+        return [getattr(row, name) for name in annotations]
@@ -0,0 +1,75 @@
+/*
+    Fetches the choices for a LazyRelatedFieldListFilter as the user types in
+    its search box, and lists them as links that apply the filter.
+*/
+(function () {
+  function initLazyFilter(container) {
+    var input = container.querySelector('input[type="search"]');
+    var results = container.querySelector('[data-lazy-filter-results]');
+    var lookupKwarg = container.dataset.lookupKwarg;
+    var removeParams = container.dataset.removeParams.split(' ');
+    var timeout = null;
+    var controller = null;
+
+    function getFilterUrl(value) {
+      var url = new URL(window.location.href);
+      removeParams.forEach(function (param) {
+        url.searchParams.delete(param);
+      });
+      url.searchParams.set(lookupKwarg, value);
+      return url.search;
+    }
+
+    function showResults(data) {
+      results.innerHTML = '';
+      data.results.forEach(function (choice) {
+        var li = document.createElement('li');
+        var a = document.createElement('a');
+        a.href = getFilterUrl(choice.value);
+        a.textContent = choice.label;
+        li.appendChild(a);
+        results.appendChild(li);
+      });
+      if (data.more) {
+        var more = document.createElement('li');
+        more.textContent = '…';
+        results.appendChild(more);
+      }
+      results.hidden = false;
+    }
+
+    function search() {
+      var query = input.value.trim();
+      if (controller) {
+        controller.abort();
+      }
+      if (!query) {
+        results.hidden = true;
+        return;
+      }
+      controller = new AbortController();
+      var url = new URL(container.dataset.choicesUrl, window.location.href);
+      url.searchParams.set('q', query);
+      fetch(url, {
+        credentials: 'same-origin',
+        signal: controller.signal,
+      })
+        .then(function (response) {
+          return response.json();
+        })
+        .then(showResults)
+        .catch(function () {});
+    }
+
+    input.addEventListener('input', function () {
+      clearTimeout(timeout);
+      timeout = setTimeout(search, 250);
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    document
+      .querySelectorAll('[data-modeladmin-lazy-filter]')
+      .forEach(initLazyFilter);
+  });
+})();
@@ -1,24 +1,18 @@
-import datetime
 import json
+from contextlib import nullcontext
 
 from django.contrib.admin.templatetags.admin_list import ResultList, result_headers
-from django.contrib.admin.utils import (
-    display_for_field,
-    display_for_value,
-    lookup_field,
-)
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
 from django.forms.utils import flatatt
 from django.template import Library
 from django.template.loader import get_template
-from django.utils.encoding import force_str
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
 from wagtail import VERSION as WAGTAIL_VERSION
 from wagtail.admin.templatetags.wagtailadmin_tags import BlockInclusionNode
 
+from ..debug import RowQueryCounter
+
 register = Library()
 
 
@@ -31,71 +25,47 @@ def items_for_result(view, result, request):
     """
     Generates the actual list of data.
     """
-    modeladmin = view.model_admin
-    for field_name in view.list_display:
-        empty_value_display = modeladmin.get_empty_value_display(field_name)
-        row_classes = ["field-%s" % field_name, "title"]
-        try:
-            f, attr, value = lookup_field(field_name, result, modeladmin)
-        except ObjectDoesNotExist:
-            result_repr = empty_value_display
-        else:
-            empty_value_display = getattr(
-                attr, "empty_value_display", empty_value_display
-            )
-            if f is None or f.auto_created:
-                allow_tags = getattr(attr, "allow_tags", False)
-                boolean = getattr(attr, "boolean", False)
-                if boolean or not value:
-                    allow_tags = True
-                result_repr = display_for_value(value, empty_value_display, boolean)
-
-                # Strip HTML tags in the resulting text, except if the
-                # function has an "allow_tags" attribute set to True.
-                if allow_tags:
-                    result_repr = mark_safe(result_repr)
-                if isinstance(value, (datetime.date, datetime.time)):
-                    row_classes.append("nowrap")
-            else:
-                if isinstance(f, models.ManyToOneRel):
-                    field_val = getattr(result, f.name)
-                    if field_val is None:
-                        result_repr = empty_value_display
-                    else:
-                        result_repr = field_val
-                else:
-                    result_repr = display_for_field(value, f, empty_value_display)
-
-                if isinstance(
-                    f, (models.DateField, models.TimeField, models.ForeignKey)
-                ):
-                    row_classes.append("nowrap")
-        if force_str(result_repr) == "":
-            result_repr = mark_safe("&nbsp;")
-        row_classes.extend(
-            modeladmin.get_extra_class_names_for_field_col(result, field_name)
-        )
-        row_attrs = modeladmin.get_extra_attrs_for_field_col(result, field_name)
-        row_attrs["class"] = " ".join(row_classes)
-        row_attrs_flat = flatatt(row_attrs)
-        primary_button = None
-        if field_name == modeladmin.get_list_display_add_buttons(request):
-            primary_button = view.button_helper.get_primary_button(result)
-        if primary_button is not None and primary_button.get("url"):
-            yield format_html(
-                '<td{}><div class="title-wrapper"><a href="{}" title="{}">{}</a></div></td>',
-                row_attrs_flat,
-                primary_button["url"],
-                primary_button.get("title", ""),
-                result_repr,
-            )
-        else:
-            yield format_html("<td{}>{}</td>", row_attrs_flat, result_repr)
-
-
-def results(view, object_list, request):
-    for item in object_list:
-        yield ResultList(None, items_for_result(view, item, request))
+    for column in view.result_columns:
+        yield column.render(result)
+
+
+def results(view, object_list, request, row_query_counter=None):
+    for index, item in enumerate(object_list):
+        with row_query_counter.row(index) if row_query_counter else nullcontext():
+            row = ResultList(None, items_for_result(view, item, request))
+        yield row
+
+
+def get_row_attrs(view, obj, index, context):
+    """
+    Returns the flattened HTML attributes for the `<tr>` element of `obj`.
+    """
+    row_attrs_dict = view.model_admin.get_extra_attrs_for_row(obj, context)
+    row_attrs_dict["data-object-pk"] = obj.pk
+    odd_or_even = "odd" if (index % 2 == 0) else "even"
+    if "class" in row_attrs_dict:
+        row_attrs_dict["class"] += " %s" % odd_or_even
+    else:
+        row_attrs_dict["class"] = odd_or_even
+    return mark_safe(flatatt(row_attrs_dict))
+
+
+def result_rows(view, object_list, context, row_query_counter=None):
+    """
+    Builds everything needed to render each row of the results table, so
+    that the whole table can be rendered by a single template.
+    """
+    for index, obj in enumerate(object_list):
+        with row_query_counter.row(index) if row_query_counter else nullcontext():
+            row = {
+                "obj": obj,
+                "row_attrs": get_row_attrs(view, obj, index, context),
+                "action_buttons": view.get_buttons_for_obj(obj),
+                "cells": [column.get_cell(obj) for column in view.result_columns],
+            }
+        if row_query_counter:
+            row_query_counter.finish_row(index)
+        yield row
 
 
 @register.inclusion_tag("modeladmin/includes/result_list.html", takes_context=True)
@@ -105,6 +75,7 @@ def result_list(context):
     """
     view = context["view"]
     object_list = context["object_list"]
+    row_query_counter = RowQueryCounter(view, len(object_list))
     headers = list(result_headers(view))
     num_sorted_fields = 0
     for h in headers:
@@ -114,21 +85,37 @@ def result_list(context):
         {
             "result_headers": headers,
             "num_sorted_fields": num_sorted_fields,
-            "results": list(results(view, object_list, context["request"])),
+            "row_query_counter": row_query_counter,
+            "single_pass": view.model_admin.single_pass_result_list,
         }
     )
+    if context["single_pass"] and view.stream:
+        # Leave a placeholder for the rows, which the view streams in once
+        # the rest of the page has been sent
+        view.stream_rows(
+            result_rows(view, object_list, context.flatten(), row_query_counter)
+        )
+        context.update(
+            {"results": object_list, "rows_placeholder": view.rows_placeholder}
+        )
+    elif context["single_pass"]:
+        rows = list(result_rows(view, object_list, context, row_query_counter))
+        context.update({"results": rows, "rows": rows})
+    else:
+        context["results"] = list(
+            results(view, object_list, context["request"], row_query_counter)
+        )
     return context
 
 
 @register.simple_tag
 def pagination_link_previous(current_page, view):
     if current_page.has_previous():
-        previous_page_number = current_page.previous_page_number()
         tpl = get_template("wagtailadmin/shared/icon.html")
         icon_svg = tpl.render({"name": "arrow-left", "classname": "default"})
         return format_html(
             '<li class="prev"><a href="{}">{} {}</a></li>',
-            view.get_query_string({view.PAGE_VAR: previous_page_number}),
+            view.get_previous_page_query_string(current_page),
             icon_svg,
             _("Previous"),
         )
@@ -138,12 +125,11 @@ def pagination_link_previous(current_page, view):
 @register.simple_tag
 def pagination_link_next(current_page, view):
     if current_page.has_next():
-        next_page_number = current_page.next_page_number()
         tpl = get_template("wagtailadmin/shared/icon.html")
         icon_svg = tpl.render({"name": "arrow-right", "classname": "default"})
         return format_html(
             '<li class="next"><a href="{}">{} {}</a></li>',
-            view.get_query_string({view.PAGE_VAR: next_page_number}),
+            view.get_next_page_query_string(current_page),
             _("Next"),
             icon_svg,
         )
@@ -167,6 +153,7 @@ def admin_list_filter(view, spec):
             "title": spec.title,
             "choices": list(spec.choices(view)),
             "spec": spec,
+            "view": view,
         }
     )
 
@@ -175,19 +162,18 @@ def admin_list_filter(view, spec):
 def result_row_display(context, index):
     obj = context["object_list"][index]
     view = context["view"]
-    row_attrs_dict = view.model_admin.get_extra_attrs_for_row(obj, context)
-    row_attrs_dict["data-object-pk"] = obj.pk
-    odd_or_even = "odd" if (index % 2 == 0) else "even"
-    if "class" in row_attrs_dict:
-        row_attrs_dict["class"] += " %s" % odd_or_even
-    else:
-        row_attrs_dict["class"] = odd_or_even
+    row_query_counter = context.get("row_query_counter")
+    with row_query_counter.row(index) if row_query_counter else nullcontext():
+        row_attrs = get_row_attrs(view, obj, index, context)
+        action_buttons = view.get_buttons_for_obj(obj)
+    if row_query_counter:
+        row_query_counter.finish_row(index)
 
     context.update(
         {
             "obj": obj,
-            "row_attrs": mark_safe(flatatt(row_attrs_dict)),
-            "action_buttons": view.get_buttons_for_obj(obj),
+            "row_attrs": row_attrs,
+            "action_buttons": action_buttons,
         }
     )
     return context
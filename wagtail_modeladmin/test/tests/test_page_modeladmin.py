@@ -1,10 +1,21 @@
+from unittest import mock
+
 from django import VERSION as DJANGO_VERSION
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from wagtail.models import GroupPagePermission, Page
 from wagtail.test.utils import WagtailTestUtils
 
+from wagtail_modeladmin.helpers.permission import (
+    PagePermissionHelper,
+    compile_path_prefixes,
+    get_page_permissions_generation,
+)
 from wagtail_modeladmin.test.models import BusinessIndex, EventCategory, EventPage
+from wagtail_modeladmin.test.wagtail_hooks import BusinessChildAdmin, EventPageAdmin
 
 
 class TestIndexView(WagtailTestUtils, TestCase):
@@ -27,6 +38,92 @@ class TestIndexView(WagtailTestUtils, TestCase):
         # User has add permission
         self.assertIs(response.context["user_can_create"], True)
 
+    @mock.patch.object(EventPageAdmin, "list_only_fields", True)
+    def test_only_fields(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+
+        eventpage = response.context["object_list"][0]
+        self.assertEqual(
+            eventpage.get_deferred_fields(),
+            {
+                "date_to",
+                "time_from",
+                "time_to",
+                "location",
+                "body",
+                "cost",
+                "signup_link",
+                "feed_image_id",
+            },
+        )
+
+        # Deferred fields are not loaded while rendering buttons for each row
+        self.assertFalse(
+            any('"body"' in query["sql"] for query in ctx.captured_queries)
+        )
+
+    @mock.patch.object(EventPageAdmin, "list_prefetch_related", ("categories",))
+    def test_list_prefetch_related(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+
+        for eventpage in response.context["object_list"]:
+            self.assertIn("categories", eventpage._prefetched_objects_cache)
+
+    @mock.patch.object(
+        EventPageAdmin, "list_display", ("title", "categories__name", "owner")
+    )
+    def test_related_columns_are_prefetched(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+
+        queryset = response.context["view"].queryset
+        self.assertEqual(queryset.query.select_related, {"owner": {}})
+        self.assertEqual(queryset._prefetch_related_lookups, ("categories",))
+
+    def test_permissions_checked_for_all_rows_at_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Copy")
+
+        # The parents of all pages, used to check if they can be copied, are
+        # fetched in one query
+        parent_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if '"wagtailcore_page"."path" IN' in query["sql"]
+        ]
+        self.assertEqual(len(parent_queries), 1)
+        self.assertFalse(
+            any(
+                '"wagtailcore_page"."path" = \'00010001' in query["sql"]
+                for query in ctx.captured_queries
+            )
+        )
+        workflow_state_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if 'FROM "wagtailcore_workflowstate"' in query["sql"]
+        ]
+        self.assertEqual(len(workflow_state_queries), 1)
+
+    def test_get_permissions_for_objs(self):
+        user = self.create_superuser("other", password="password")
+        permission_helper = EventPageAdmin().permission_helper
+        pages = EventPage.objects.order_by("pk")
+
+        permissions = permission_helper.get_permissions_for_objs(user, pages)
+
+        self.assertEqual(list(permissions), [page.pk for page in pages])
+        for page in EventPage.objects.order_by("pk"):
+            expected = {"inspect", "edit", "delete", "copy"}
+            if page.live:
+                expected.add("unpublish")
+            self.assertEqual(permissions[page.pk], expected)
+
     def test_filter(self):
         # Filter by audience
         response = self.get(audience__exact="public")
@@ -178,6 +275,26 @@ class TestCreateView(WagtailTestUtils, TestCase):
             response, "%s?next=%s" % (expected_path, expected_next_path)
         )
 
+    def test_valid_parent_pages_fetched_once(self):
+        homepage = Page.objects.get(url_path="/home/")
+        business_index = BusinessIndex(title="Business Index")
+        homepage.add_child(instance=business_index)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/admin/modeladmintest/businesschild/create/")
+        self.assertEqual(response.status_code, 302)
+
+        # A single query fetching at most two pages decides both whether the
+        # user can create pages and which parent to redirect to
+        parent_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if "content_type_id" in query["sql"]
+            and '"wagtailcore_page"' in query["sql"]
+        ]
+        self.assertEqual(len(parent_queries), 1)
+        self.assertIn("LIMIT 2", parent_queries[0])
+
 
 class TestInspectView(WagtailTestUtils, TestCase):
     fixtures = ["test_specific.json", "modeladmintest_test.json"]
@@ -370,7 +487,7 @@ class TestChooseParentView(WagtailTestUtils, TestCase):
         )
 
 
-class TestChooseParentViewForNonSuperuser(WagtailTestUtils, TestCase):
+class BusinessEditorMixin:
     fixtures = ["test_specific.json"]
 
     def setUp(self):
@@ -392,6 +509,8 @@ class TestChooseParentViewForNonSuperuser(WagtailTestUtils, TestCase):
             draft_title="Private Business Index",
         )
         homepage.add_child(instance=secret_business_index)
+        self.business_index = business_index
+        self.secret_business_index = secret_business_index
 
         business_editors = Group.objects.create(name="Business editors")
         business_editors.permissions.add(
@@ -414,9 +533,24 @@ class TestChooseParentViewForNonSuperuser(WagtailTestUtils, TestCase):
 
         user = self.create_user(username="test2", password="password")
         user.groups.add(business_editors)
+        self.user = user
+        self.business_editors = business_editors
         # Login
         self.login(username="test2", password="password")
 
+    def add_page_permission(self, page):
+        GroupPagePermission.objects.create(
+            group=self.business_editors,
+            page=page,
+            permission=Permission.objects.get(
+                content_type__app_label="wagtailcore", codename="add_page"
+            ),
+        )
+
+
+class TestChooseParentViewForNonSuperuser(
+    BusinessEditorMixin, WagtailTestUtils, TestCase
+):
     def test_simple(self):
         response = self.client.get("/admin/modeladmintest/businesschild/choose_parent/")
 
@@ -424,6 +558,109 @@ class TestChooseParentViewForNonSuperuser(WagtailTestUtils, TestCase):
         self.assertContains(response, "Public Business Index")
         self.assertNotContains(response, "Private Business Index")
 
+    def test_nested_permissions_left_out(self):
+        self.add_page_permission(
+            self.business_index.add_child(instance=BusinessIndex(title="Nested"))
+        )
+        permission_helper = BusinessChildAdmin().permission_helper
+        user = get_user_model().objects.get(pk=self.user.pk)
+        prefixes = permission_helper.get_add_page_path_prefixes(user)
+        self.assertEqual(len(prefixes), 2)
+        self.assertIn(self.business_index.path, prefixes)
+        # Worked out once for each request (i.e. user object)
+        with self.assertNumQueries(0):
+            self.assertIs(permission_helper.get_add_page_path_prefixes(user), prefixes)
+
+        with CaptureQueriesContext(connection) as ctx:
+            parents = list(permission_helper.get_valid_parent_pages(user))
+        self.assertEqual(len(parents), 3)
+        self.assertEqual(ctx.captured_queries[-1]["sql"].count("LIKE"), 2)
+
+    def test_prefixes_reflect_permission_changes(self):
+        url = "/admin/modeladmintest/businesschild/choose_parent/"
+        self.assertNotContains(self.client.get(url), "Private Business Index")
+        self.add_page_permission(self.secret_business_index)
+        self.assertContains(self.client.get(url), "Private Business Index")
+
+        # Removing the user from the group loses the add permissions
+        admins = Group.objects.create(name="Admin users")
+        admins.permissions.add(Permission.objects.get(codename="access_admin"))
+        self.user.groups.add(admins)
+        self.user.groups.remove(self.business_editors)
+        response = self.client.get(url)
+        self.assertRedirects(response, "/admin/")
+
+
+@mock.patch.object(PagePermissionHelper, "add_page_path_prefixes_cache_timeout", 300)
+class TestCachedAddPagePathPrefixes(BusinessEditorMixin, WagtailTestUtils, TestCase):
+    def get_prefixes(self):
+        # A fresh user object, as if in another request
+        user = get_user_model().objects.get(pk=self.user.pk)
+        return BusinessChildAdmin().permission_helper.get_add_page_path_prefixes(user)
+
+    def test_cached_between_requests(self):
+        prefixes = self.get_prefixes()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.get_prefixes(), prefixes)
+        self.assertFalse(
+            any(
+                "wagtailcore_grouppagepermission" in query["sql"]
+                for query in ctx.captured_queries
+            )
+        )
+
+    def test_invalidated_when_permissions_change(self):
+        self.assertNotIn(self.secret_business_index.path, self.get_prefixes())
+        self.add_page_permission(self.secret_business_index)
+        self.assertIn(self.secret_business_index.path, self.get_prefixes())
+
+
+@mock.patch.object(PagePermissionHelper, "valid_parent_pages_cache_timeout", 300)
+class TestCachedValidParentPages(BusinessEditorMixin, WagtailTestUtils, TestCase):
+    def get_valid_parent_pages(self, user):
+        # A fresh user object, as if in another request
+        user = get_user_model().objects.get(pk=user.pk)
+        return BusinessChildAdmin().permission_helper.get_valid_parent_pages(user)
+
+    def test_cached_for_users_in_same_groups(self):
+        other_user = self.create_user(username="test3", password="password")
+        other_user.groups.add(self.business_editors)
+
+        parents = self.get_valid_parent_pages(self.user)
+        self.assertEqual(len(parents), 2)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(set(self.get_valid_parent_pages(other_user)), set(parents))
+        self.assertFalse(any("LIKE" in query["sql"] for query in ctx.captured_queries))
+
+    def test_invalidated_when_page_created(self):
+        self.assertEqual(len(self.get_valid_parent_pages(self.user)), 2)
+        self.business_index.add_child(instance=BusinessIndex(title="Nested"))
+        self.assertEqual(len(self.get_valid_parent_pages(self.user)), 3)
+
+    def test_invalidated_when_page_deleted(self):
+        self.assertEqual(len(self.get_valid_parent_pages(self.user)), 2)
+        self.business_index.delete()
+        self.assertEqual(len(self.get_valid_parent_pages(self.user)), 1)
+
+    def test_not_invalidated_by_other_models(self):
+        generation = get_page_permissions_generation()
+        EventCategory.objects.create(name="Other")
+        self.assertEqual(get_page_permissions_generation(), generation)
+        self.business_index.add_child(instance=BusinessIndex(title="Nested"))
+        self.assertNotEqual(get_page_permissions_generation(), generation)
+
+
+class TestCompilePathPrefixes(TestCase):
+    def test_nested_paths_left_out(self):
+        self.assertEqual(
+            compile_path_prefixes(["00010002", "0001", "00020001", "000200010003"]),
+            ["0001", "00020001"],
+        )
+        self.assertEqual(
+            compile_path_prefixes(["0002", "0001", "0002"]), ["0001", "0002"]
+        )
+        self.assertEqual(compile_path_prefixes([]), [])
+
 
 class TestEditorAccess(WagtailTestUtils, TestCase):
     fixtures = ["test_specific.json"]
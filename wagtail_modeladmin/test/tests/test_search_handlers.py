@@ -1,12 +1,19 @@
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from wagtail.search.backends import get_search_backend
 
 from wagtail_modeladmin.helpers import (
+    DatabaseFullTextSearchHandler,
     DjangoORMSearchHandler,
     WagtailBackendSearchHandler,
 )
-from wagtail_modeladmin.test.models import Book
+from wagtail_modeladmin.helpers.search import CachedSearchResults
+from wagtail_modeladmin.test.models import Author, Book
+from wagtail_modeladmin.test.wagtail_hooks import BookModelAdmin
 
 
 class FakeSearchBackend:
@@ -61,6 +68,134 @@ class TestORMSearchHandler(TestCase):
         result = search_handler.search_queryset(queryset, "Lord of the rings")
         self.assertEqual(list(expected_result), list(result))
 
+    def test_search_queryset_lookup_prefixes(self):
+        search_handler = self.get_search_handler(
+            search_fields=("^title", "=author__name", "@title", "title")
+        )
+        self.assertEqual(
+            search_handler.orm_lookups,
+            [
+                "title__istartswith",
+                "author__name__iexact",
+                "title__search",
+                "title__icontains",
+            ],
+        )
+
+        search_handler = self.get_search_handler(search_fields=("^title",))
+        queryset = self.get_queryset().order_by("pk")
+        self.assertEqual(
+            [book.pk for book in search_handler.search_queryset(queryset, "the")],
+            [1, 2, 4],
+        )
+        self.assertFalse(search_handler.search_queryset(queryset, "lord").exists())
+
+        search_handler = self.get_search_handler(search_fields=("=author__name",))
+        self.assertEqual(
+            [book.pk for book in search_handler.search_queryset(queryset, "dahl")],
+            [],
+        )
+        Author.objects.filter(pk=2).update(name="Dahl")
+        self.assertEqual(
+            [book.pk for book in search_handler.search_queryset(queryset, "dahl")],
+            [3],
+        )
+
+    def test_search_exact(self):
+        search_handler = self.get_search_handler(search_fields=("title",))
+        search_handler.exact_fields = ("pk", "title")
+        queryset = self.get_queryset().order_by("pk")
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = list(search_handler.search_queryset(queryset, " 3 "))
+        self.assertEqual([book.pk for book in result], [3])
+        # One query to check for the exact match, and one to fetch it,
+        # neither of which searches the search fields
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertFalse(any("LIKE" in query["sql"] for query in ctx.captured_queries))
+
+        result = search_handler.search_queryset(queryset, "The Hobbit")
+        self.assertEqual([book.pk for book in result], [2])
+
+        # Terms that aren't a valid primary key, or match nothing exactly,
+        # are searched for as normal
+        result = search_handler.search_queryset(queryset, "lord")
+        self.assertEqual([book.pk for book in result], [1, 4])
+        result = search_handler.search_queryset(queryset, "99")
+        self.assertEqual(list(result), [])
+
+    def test_search_exact_across_relations(self):
+        search_handler = self.get_search_handler(
+            search_fields=("title", "author__name")
+        )
+        search_handler.exact_fields = ("author__name", "author")
+        queryset = self.get_queryset().order_by("pk")
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = list(search_handler.search_queryset(queryset, "Roald Dahl"))
+        self.assertEqual([book.pk for book in result], [3, 4])
+        self.assertFalse(any("LIKE" in query["sql"] for query in ctx.captured_queries))
+        # "author" is compared with the author's primary key
+        result = search_handler.search_queryset(queryset, "1")
+        self.assertEqual([book.pk for book in result], [1, 2])
+        result = search_handler.search_queryset(queryset, "lord")
+        self.assertEqual([book.pk for book in result], [1, 4])
+
+    def test_search_exact_fields_from_model_admin(self):
+        model_admin = BookModelAdmin()
+        self.assertEqual(model_admin.get_search_handler(None).exact_fields, ())
+        with patch.object(BookModelAdmin, "search_exact_fields", ("pk",)):
+            search_handler = model_admin.get_search_handler(None)
+        self.assertEqual(search_handler.exact_fields, ("pk",))
+
+    def test_search_exact_fields_check(self):
+        model_admin = BookModelAdmin()
+        with patch.object(
+            BookModelAdmin,
+            "search_exact_fields",
+            (
+                "pk",
+                "author__name",
+                "author__pk",
+                "title__name",
+                "missing",
+                "author__book",
+            ),
+        ):
+            errors = model_admin.check_search_exact_fields()
+        self.assertEqual(
+            [error.id for error in errors], ["wagtail_modeladmin.E001"] * 3
+        )
+        self.assertIn("'title__name'", errors[0].msg)
+        self.assertIn("'missing'", errors[1].msg)
+        self.assertIn("'author__book'", errors[2].msg)
+
+    def test_search_across_relation_with_subqueries(self):
+        search_handler = self.get_search_handler(search_fields=("book__title",))
+        queryset = Author.objects.order_by("pk")
+
+        result = search_handler.search_queryset(queryset, "the")
+        self.assertIn("DISTINCT", str(result.query))
+        self.assertEqual([author.pk for author in result], [1, 2, 3])
+
+        search_handler.relation_filter_mode = "exists"
+        result = search_handler.search_queryset(queryset, "the")
+        self.assertNotIn("DISTINCT", str(result.query))
+        self.assertEqual([author.pk for author in result], [1, 2, 3])
+        result = search_handler.search_queryset(queryset, "lord")
+        self.assertEqual([author.pk for author in result], [1, 3])
+
+    def test_lookups_resolved_once(self):
+        with patch.object(
+            DjangoORMSearchHandler,
+            "construct_search",
+            side_effect=lambda field_name: "%s__icontains" % field_name,
+        ) as construct_search:
+            search_handler = self.get_search_handler(search_fields=("title",))
+            for search_term in ("lord", "hobbit", "narnia"):
+                list(search_handler.search_queryset(self.get_queryset(), search_term))
+        construct_search.assert_called_once_with("title")
+
     def test_show_search_form(self):
         search_handler = self.get_search_handler(search_fields=None)
         self.assertFalse(search_handler.show_search_form)
@@ -69,7 +204,205 @@ class TestORMSearchHandler(TestCase):
         self.assertTrue(search_handler.show_search_form)
 
 
+class TestDatabaseFullTextSearchHandler(TransactionTestCase):
+    # SQLite can't roll back to a savepoint from before an FTS5 table was
+    # created, so these tests can't run inside a transaction
+    fixtures = ["modeladmintest_test.json"]
+
+    def setUp(self):
+        self.get_search_handler().setup_sqlite_index(Book)
+        self.addCleanup(self.get_search_handler().remove_sqlite_index, Book)
+
+    def get_search_handler(self, search_fields=("title",)):
+        return DatabaseFullTextSearchHandler(search_fields)
+
+    def get_fts_objects(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name LIKE 'modeladmintest_book_fts%' "
+                "AND (type = 'trigger' OR sql LIKE 'CREATE VIRTUAL TABLE%')"
+            )
+            return sorted(name for (name,) in cursor.fetchall())
+
+    def test_setup_sqlite_index(self):
+        search_handler = self.get_search_handler()
+        fts_table = search_handler.get_sqlite_table_name(Book, ["title"])
+        expected = sorted(
+            [fts_table] + [fts_table + suffix for suffix in ("_ai", "_ad", "_au")]
+        )
+        self.assertEqual(self.get_fts_objects(), expected)
+
+        # Setting up again is harmless, and no searches change the schema
+        search_handler.setup_sqlite_index(Book)
+        self.search("lord")
+        self.assertEqual(self.get_fts_objects(), expected)
+
+    def test_setup_removes_tables_for_other_search_fields(self):
+        search_handler = self.get_search_handler()
+        with patch.object(
+            DatabaseFullTextSearchHandler,
+            "get_sqlite_table_name",
+            return_value="modeladmintest_book_fts_00000000",
+        ):
+            search_handler.setup_sqlite_index(Book)
+        self.assertEqual(
+            self.get_fts_objects(),
+            [
+                "modeladmintest_book_fts_00000000",
+                "modeladmintest_book_fts_00000000_ad",
+                "modeladmintest_book_fts_00000000_ai",
+                "modeladmintest_book_fts_00000000_au",
+            ],
+        )
+
+    def test_falls_back_to_orm_search_without_index(self):
+        self.get_search_handler().remove_sqlite_index(Book)
+        self.assertEqual(self.get_fts_objects(), [])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.search("lord"), [1, 4])
+        self.assertFalse(
+            any("CREATE" in query["sql"] for query in ctx.captured_queries)
+        )
+
+    def get_queryset(self):
+        return Book.objects.order_by("pk")
+
+    def search(self, search_term, search_fields=("title",), **kwargs):
+        search_handler = self.get_search_handler(search_fields)
+        result = search_handler.search_queryset(
+            self.get_queryset(), search_term, **kwargs
+        )
+        return [book.pk for book in result]
+
+    def test_search_queryset_no_search_query(self):
+        search_handler = self.get_search_handler()
+        queryset = self.get_queryset()
+        self.assertIs(search_handler.search_queryset(queryset, ""), queryset)
+
+    def test_search_queryset(self):
+        self.assertEqual(self.search("rings lord"), [1])
+        # Words match as prefixes
+        self.assertEqual(self.search("hob"), [2])
+        self.assertEqual(self.search("dragons"), [])
+        # Lookup prefixes are ignored
+        self.assertEqual(self.search("rings", search_fields=("=title",)), [1])
+
+    def test_search_queryset_ranked(self):
+        # The shorter title is the better match
+        self.assertEqual(self.search("lord"), [1, 4])
+        queryset = self.get_search_handler().search_queryset(
+            Book.objects.order_by("-pk"), "lord"
+        )
+        self.assertEqual([book.pk for book in queryset], [1, 4])
+        self.assertLess(queryset[0].search_rank, 0)
+
+    def test_search_queryset_preserve_order(self):
+        search_handler = self.get_search_handler()
+        queryset = search_handler.search_queryset(
+            Book.objects.order_by("-pk"), "lord", preserve_order=True
+        )
+        self.assertEqual([book.pk for book in queryset], [4, 1])
+
+    def test_search_exact(self):
+        search_handler = self.get_search_handler()
+        search_handler.exact_fields = ("pk",)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(
+                [book.pk for book in search_handler.search_queryset(Book.objects, "4")],
+                [4],
+            )
+        # The full-text index isn't searched for exact matches
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertFalse(
+            any(
+                "MATCH" in query["sql"] or "sqlite_master" in query["sql"]
+                for query in ctx.captured_queries
+            )
+        )
+        # Ranked results are used when nothing matches exactly
+        queryset = search_handler.search_queryset(Book.objects.order_by("-pk"), "lord")
+        self.assertEqual([book.pk for book in queryset], [1, 4])
+        self.assertLess(queryset[0].search_rank, 0)
+
+    def test_search_queryset_syntax_treated_literally(self):
+        self.assertEqual(self.search('"lord" OR NOT'), [])
+        self.assertEqual(self.search("hobbit)"), [2])
+
+    def test_index_kept_up_to_date(self):
+        self.assertEqual(self.search("lord"), [1, 4])
+        Book.objects.filter(pk=1).update(title="The Fellowship of the Ring")
+        book = Book.objects.create(
+            title="Lord of the Flies", author=Author.objects.get(pk=5)
+        )
+        Book.objects.filter(pk=4).delete()
+        self.assertEqual(self.search("lord"), [book.pk])
+        self.assertEqual(self.search("fellowship"), [1])
+
+    def test_related_fields_fall_back_to_orm_search(self):
+        self.assertEqual(self.search("dahl", search_fields=("author__name",)), [3, 4])
+
+    def test_index_view(self):
+        self.client.force_login(
+            get_user_model().objects.create_superuser(
+                "admin", "admin@example.com", "password"
+            )
+        )
+        with patch.multiple(
+            BookModelAdmin,
+            search_handler_class=DatabaseFullTextSearchHandler,
+            search_fields=("title",),
+        ):
+            response = self.client.get(
+                "/admin/modeladmintest/book/", {"q": "lord", "author__id__exact": 3}
+            )
+            self.assertEqual([book.pk for book in response.context["object_list"]], [4])
+
+            response = self.client.get(
+                "/admin/modeladmintest/book/", {"q": "the", "o": "0"}
+            )
+            self.assertEqual(
+                [book.title for book in response.context["object_list"]],
+                [
+                    "Charlie and the Chocolate Factory",
+                    "The Chronicles of the Lord of Narnia",
+                    "The Hobbit",
+                    "The Lord of the Rings",
+                ],
+            )
+
+    def test_index_view_with_keyset_pagination(self):
+        self.client.force_login(
+            get_user_model().objects.create_superuser(
+                "admin", "admin@example.com", "password"
+            )
+        )
+        with patch.multiple(
+            BookModelAdmin,
+            search_handler_class=DatabaseFullTextSearchHandler,
+            search_fields=("title",),
+            pagination_mode="keyset",
+            list_per_page=1,
+        ):
+            # Keyset pages would be ordered by title, so ranked results are
+            # paginated by number instead
+            response = self.client.get("/admin/modeladmintest/book/", {"q": "lord"})
+            self.assertEqual([book.pk for book in response.context["object_list"]], [1])
+            response = self.client.get(
+                "/admin/modeladmintest/book/", {"q": "lord", "p": 2}
+            )
+            self.assertEqual([book.pk for book in response.context["object_list"]], [4])
+
+            # Keyset pagination is still used when the user picks an ordering
+            response = self.client.get(
+                "/admin/modeladmintest/book/", {"q": "lord", "o": "0"}
+            )
+            self.assertEqual([book.pk for book in response.context["object_list"]], [4])
+            self.assertTrue(response.context["page_obj"].next_cursor)
+
+
 class TestSearchBackendHandler(TestCase):
+    fixtures = ["modeladmintest_test.json"]
+
     def get_search_handler(self, search_fields=None):
         return WagtailBackendSearchHandler(search_fields)
 
@@ -155,6 +488,98 @@ class TestSearchBackendHandler(TestCase):
             },
         )
 
+    def test_search_results_cached(self):
+        search_handler = self.get_search_handler()
+        search_handler.cache_timeout = 60
+        queryset = self.get_queryset()
+        results = search_handler.search_queryset(queryset, "lord")
+        self.assertEqual(sorted(book.pk for book in results), [1, 4])
+        pks = results.pks
+
+        with patch(
+            "wagtail_modeladmin.helpers.search.get_search_backend"
+        ) as get_search_backend:
+            results = search_handler.search_queryset(queryset, "lord")
+            self.assertEqual(results.count(), 2)
+            # Only the objects in the slice are fetched
+            with self.assertNumQueries(1):
+                self.assertEqual([book.pk for book in results[1:]], pks[1:])
+        get_search_backend.assert_not_called()
+
+        # Searches with different filters are cached separately
+        results = search_handler.search_queryset(queryset.filter(id=1), "lord")
+        self.assertEqual([book.pk for book in results], [1])
+
+    def test_search_results_not_cached_by_default(self):
+        search_handler = self.get_search_handler()
+        results = search_handler.search_queryset(self.get_queryset(), "lord")
+        self.assertNotIsInstance(results, CachedSearchResults)
+
+    def get_search_index_queries(self, queries):
+        return [
+            query for query in queries if "wagtailsearch_indexentry" in query["sql"]
+        ]
+
+    def test_first_results_cached_when_there_are_too_many(self):
+        search_handler = self.get_search_handler()
+        search_handler.cache_timeout = 60
+        search_handler.cache_max_results = 2
+        queryset = self.get_queryset()
+
+        # The primary keys of the first results, and the total count
+        with CaptureQueriesContext(connection) as ctx:
+            results = search_handler.search_queryset(queryset, "the")
+        self.assertIsInstance(results, CachedSearchResults)
+        self.assertEqual(len(self.get_search_index_queries(ctx.captured_queries)), 2)
+        self.assertEqual(results.count(), 4)
+        self.assertEqual(len(results.pks), 2)
+
+        # The cached results don't need the search index
+        with CaptureQueriesContext(connection) as ctx:
+            results = search_handler.search_queryset(queryset, "the")
+            first_page = results[:2]
+        self.assertEqual([book.pk for book in first_page], results.pks)
+        self.assertEqual(self.get_search_index_queries(ctx.captured_queries), [])
+
+        # Pages past them search again
+        with CaptureQueriesContext(connection) as ctx:
+            second_page = results[2:4]
+        self.assertEqual(len(self.get_search_index_queries(ctx.captured_queries)), 1)
+        self.assertEqual({book.pk for book in first_page + second_page}, {1, 2, 3, 4})
+
+    def test_search_results_cache_timeout_from_model_admin(self):
+        model_admin = BookModelAdmin()
+        self.assertEqual(model_admin.get_search_handler(None).cache_timeout, 0)
+        with patch.object(BookModelAdmin, "search_results_cache_timeout", 300):
+            search_handler = model_admin.get_search_handler(None)
+        self.assertEqual(search_handler.cache_timeout, 300)
+
+    def test_index_view_pages_through_cached_results(self):
+        user = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="password"
+        )
+        self.client.force_login(user)
+
+        with (
+            patch.multiple(
+                BookModelAdmin, search_results_cache_timeout=60, list_per_page=2
+            ),
+            patch(
+                "wagtail_modeladmin.helpers.search.get_search_backend",
+                side_effect=get_search_backend,
+            ) as mock_get_search_backend,
+        ):
+            titles = []
+            for page in (1, 2):
+                response = self.client.get(
+                    "/admin/modeladmintest/book/", {"q": "the", "p": page}
+                )
+                self.assertEqual(response.context["result_count"], 4)
+                titles += [book.title for book in response.context["object_list"]]
+
+        self.assertEqual(mock_get_search_backend.call_count, 1)
+        self.assertEqual(len(set(titles)), 4)
+
     def test_show_search_form(self):
         search_handler = self.get_search_handler(search_fields=None)
         self.assertTrue(search_handler.show_search_form)
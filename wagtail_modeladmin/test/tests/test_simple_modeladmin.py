@@ -1,13 +1,22 @@
 import datetime
+import tempfile
+import warnings
 from io import BytesIO
 from unittest import mock
 
+from django.contrib.admin import SimpleListFilter
+from django.contrib.admin.utils import _get_non_gfk_field, lookup_field
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.sessions.backends.db import SessionStore
 from django.core import checks
+from django.db import connection
+from django.db.models import QuerySet
+from django.template.response import TemplateResponse
 from django.templatetags.static import static
-from django.test import TestCase, TransactionTestCase
-from django.test.utils import override_settings
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.utils.timezone import make_aware
 from openpyxl import load_workbook
 from wagtail import VERSION as WAGTAIL_VERSION
@@ -22,7 +31,14 @@ from wagtail.images.tests.utils import get_test_image_file
 from wagtail.models import Locale, ModelLogEntry, Page
 from wagtail.test.utils import WagtailTestUtils
 
+from wagtail_modeladmin.debug import RowQueryWarning
+from wagtail_modeladmin.exports import ExportJob
+from wagtail_modeladmin.filters import LazyRelatedFieldListFilter
+from wagtail_modeladmin.helpers.permission import get_permission_snapshot
 from wagtail_modeladmin.helpers.search import DjangoORMSearchHandler
+from wagtail_modeladmin.menus import MenuVisibilityResolver
+from wagtail_modeladmin.options import ModelAdmin
+from wagtail_modeladmin.pagination import KeysetPaginator
 from wagtail_modeladmin.test.models import (
     Author,
     Book,
@@ -33,7 +49,13 @@ from wagtail_modeladmin.test.models import (
     Token,
     TranslatableBook,
 )
-from wagtail_modeladmin.test.wagtail_hooks import BookModelAdmin, EventsAdminGroup
+from wagtail_modeladmin.test.wagtail_hooks import (
+    AuthorModelAdmin,
+    BookModelAdmin,
+    BookModelIndexView,
+    EventsAdminGroup,
+    TranslatableBookModelAdmin,
+)
 
 
 class TestBookIndexView(WagtailTestUtils, TestCase):
@@ -105,6 +127,22 @@ class TestBookIndexView(WagtailTestUtils, TestCase):
             data_lines[4], "The Lord of the Rings,J. R. R. Tolkien,1892-01-03\r"
         )
 
+    @mock.patch.object(BookModelAdmin, "export_chunk_size", 1)
+    def test_csv_export_is_streamed_in_chunks(self):
+        with mock.patch.object(
+            QuerySet, "iterator", autospec=True, side_effect=QuerySet.iterator
+        ) as iterator:
+            response = self.get(export="csv")
+            self.assertTrue(response.streaming)
+            data_lines = b"".join(response.streaming_content).decode().split("\n")
+
+        iterator.assert_called_once_with(mock.ANY, chunk_size=1)
+        self.assertEqual(len(data_lines), 6)
+        self.assertEqual(data_lines[0], "Title,Author,Author Date Of Birth\r")
+        self.assertEqual(
+            data_lines[4], "The Lord of the Rings,J. R. R. Tolkien,1892-01-03\r"
+        )
+
     def test_xlsx_export(self):
         # Export the whole queryset
         response = self.get(export="xlsx")
@@ -233,6 +271,168 @@ class TestBookIndexView(WagtailTestUtils, TestCase):
         response = self.get()
         self.assertTemplateUsed(response, "wagtailadmin/shared/export_buttons.html")
 
+    def test_queryset_built_once_per_request(self):
+        with mock.patch.object(
+            BookModelIndexView,
+            "get_queryset",
+            autospec=True,
+            side_effect=BookModelIndexView.get_queryset,
+        ) as get_queryset:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.get(q="lord", o="0")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_queryset.call_count, 1)
+
+        # The choices for the author filter are only loaded once
+        author_choice_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if 'FROM "modeladmintest_author"' in query["sql"]
+            and "WHERE" not in query["sql"]
+        ]
+        self.assertEqual(len(author_choice_queries), 1)
+
+    def test_result_columns_compiled_once(self):
+        with mock.patch(
+            "wagtail_modeladmin.columns._get_non_gfk_field",
+            side_effect=_get_non_gfk_field,
+        ) as get_field:
+            with mock.patch(
+                "wagtail_modeladmin.columns.lookup_field", side_effect=lookup_field
+            ) as mock_lookup_field:
+                response = self.get()
+
+        # Each column is resolved once, rather than for each of the 4 books
+        self.assertEqual(get_field.call_count, 3)
+        mock_lookup_field.assert_not_called()
+        self.assertContains(
+            response,
+            '<td class="field-author nowrap title">J. R. R. Tolkien</td>',
+            html=True,
+            count=2,
+        )
+
+    def test_result_list_rendered_in_one_pass(self):
+        # Rows are rendered by the row templates by default, so that
+        # overrides of them keep working
+        legacy_response = self.get()
+        self.assertTemplateUsed(legacy_response, "modeladmin/includes/result_row.html")
+
+        with mock.patch.object(BookModelAdmin, "single_pass_result_list", True):
+            response = self.get()
+        self.assertTemplateUsed(response, "modeladmin/includes/result_list.html")
+        self.assertTemplateNotUsed(response, "modeladmin/includes/result_row.html")
+        self.assertTemplateNotUsed(
+            response, "modeladmin/includes/result_row_value.html"
+        )
+
+        # Both ways of rendering the rows produce the same table
+        def get_table(response):
+            content = response.content.decode()
+            return content[content.index("<table") : content.index("</table>") + 8]
+
+        self.assertHTMLEqual(get_table(response), get_table(legacy_response))
+
+    @mock.patch.object(BookModelAdmin, "single_pass_result_list", True)
+    @mock.patch.object(BookModelAdmin, "stream_index_view", True)
+    @mock.patch.object(BookModelIndexView, "stream_chunk_size", 3)
+    def test_streamed_index(self):
+        response = self.get()
+        self.assertTrue(response.streaming)
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+
+        # The page up to the rows, the 4 rows in 2 chunks, then the rest
+        self.assertEqual(len(chunks), 4)
+        self.assertTrue(chunks[0].rstrip().endswith("<tbody>"))
+        self.assertEqual(chunks[1].count("<tr"), 3)
+        self.assertEqual(chunks[2].count("<tr"), 1)
+        self.assertTrue(chunks[3].lstrip().startswith("</tbody>"))
+
+        with mock.patch.object(BookModelAdmin, "stream_index_view", False):
+            unstreamed_response = self.get()
+        content = unstreamed_response.content.decode()
+        rows = content.split("<tbody>", 1)[1].split("</tbody>", 1)[0]
+        self.assertHTMLEqual("".join(chunks[1:3]), rows)
+
+    @mock.patch.object(BookModelAdmin, "stream_index_view", True)
+    def test_not_streamed_without_single_pass(self):
+        response = self.get()
+        self.assertFalse(response.streaming)
+        self.assertIsInstance(response, TemplateResponse)
+        self.assertContains(response, "The Lord of the Rings")
+
+    def test_related_columns_are_selected(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+
+        # The author column (and get_extra_attrs_for_row(), which uses it)
+        # doesn't need a query per book
+        author_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if 'FROM "modeladmintest_author"' in query["sql"]
+            and "WHERE" in query["sql"]
+        ]
+        self.assertEqual(author_queries, [])
+
+    @override_settings(WAGTAIL_MODELADMIN_WARN_ROW_QUERIES=True)
+    def test_row_query_warning(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.get()
+        self.assertEqual(
+            [w for w in caught if issubclass(w.category, RowQueryWarning)], []
+        )
+
+        # get_extra_attrs_for_row() uses the author, which is no longer selected
+        with mock.patch.object(
+            BookModelAdmin, "list_display", ("title", "admin_thumb")
+        ):
+            with self.assertWarnsRegex(
+                RowQueryWarning,
+                r"4 of the 4 rows in the listing for modeladmintest.Book",
+            ):
+                self.get()
+
+    @mock.patch.object(BookModelAdmin, "list_only_fields", True)
+    def test_only_fields(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "The Lord of the Rings")
+        self.assertContains(response, "J. R. R. Tolkien")
+
+        listing_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith('SELECT "modeladmintest_book"."id"')
+        ]
+        self.assertEqual(len(listing_queries), 1)
+        self.assertIn('"modeladmintest_book"."cover_image_id"', listing_queries[0])
+        self.assertNotIn(
+            '"modeladmintest_book"."extract_document_id"', listing_queries[0]
+        )
+
+        # The deferred field is not loaded for any of the books
+        self.assertFalse(
+            any("extract_document_id" in query["sql"] for query in ctx.captured_queries)
+        )
+
+    @mock.patch.object(BookModelAdmin, "list_only_fields", ("extract_document",))
+    def test_only_fields_with_additional_fields(self):
+        response = self.get()
+        book = response.context["object_list"][0]
+        self.assertEqual(book.get_deferred_fields(), set())
+
+    @mock.patch.object(BookModelAdmin, "list_only_fields", True)
+    def test_csv_export_with_only_fields(self):
+        response = self.get(export="csv")
+        data_lines = b"".join(response.streaming_content).decode().split("\n")
+        self.assertEqual(
+            data_lines[4], "The Lord of the Rings,J. R. R. Tolkien,1892-01-03\r"
+        )
+
 
 class TestBookIndexViewSearch(WagtailTestUtils, TransactionTestCase):
     fixtures = ["modeladmintest_test.json"]
@@ -302,6 +502,36 @@ class TestAuthorIndexView(WagtailTestUtils, TestCase):
         """
         self.assertContains(response, test_html, html=True)
 
+    @mock.patch.object(AuthorModelAdmin, "pagination_mode", "keyset")
+    @mock.patch.object(AuthorModelAdmin, "list_per_page", 1)
+    def test_search_with_keyset_pagination(self):
+        response = self.get(q="Roald Dahl")
+        self.assertEqual(response.context["result_count"], 2)
+        first = response.context["object_list"][0]
+
+        response = self.get(
+            q="Roald Dahl", cursor=response.context["page_obj"].next_cursor
+        )
+        second = response.context["object_list"][0]
+        self.assertEqual(second.name, "Roald Dahl")
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertFalse(response.context["page_obj"].has_next())
+
+    def test_filter_across_relation(self):
+        response = self.get(book__title__icontains="the")
+        self.assertEqual(response.context["result_count"], 3)
+
+        with mock.patch.object(AuthorModelAdmin, "relation_filter_mode", "exists"):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.get(book__title__icontains="the")
+        self.assertEqual(response.context["result_count"], 3)
+        self.assertEqual(
+            sorted(obj.pk for obj in response.context["object_list"]), [1, 2, 3]
+        )
+        self.assertFalse(
+            any("DISTINCT" in query["sql"] for query in ctx.captured_queries)
+        )
+
     def test_title_column_links_to_edit_view_by_default(self):
         response = self.get()
         self.assertEqual(response.status_code, 200)
@@ -346,6 +576,557 @@ class TestAuthorIndexView(WagtailTestUtils, TestCase):
         )
 
 
+@mock.patch.object(BookModelAdmin, "list_per_page", 2)
+class TestBookIndexViewResultCountModes(WagtailTestUtils, TestCase):
+    fixtures = ["modeladmintest_test.json"]
+
+    def setUp(self):
+        self.login()
+
+    def get(self, **params):
+        return self.client.get("/admin/modeladmintest/book/", params)
+
+    def get_count_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get(**params)
+        queries = [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+        return response, queries
+
+    def test_exact_count_is_not_repeated_by_paginator(self):
+        response, queries = self.get_count_queries()
+        self.assertEqual(response.context["result_count"], 4)
+        self.assertEqual(response.context["paginator"].num_pages, 2)
+        # The unfiltered listing only needs a single count for both
+        # all_count and result_count
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, "Page 1 of 2")
+
+    def test_filtered_listing_counts_results_and_total(self):
+        response, queries = self.get_count_queries(author__id__exact=1)
+        self.assertEqual(response.context["result_count"], 2)
+        self.assertEqual(response.context["all_count"], 4)
+        self.assertEqual(len(queries), 2)
+
+    def test_default_filter_counts_results_and_total(self):
+        class DefaultAuthorFilter(SimpleListFilter):
+            title = "author"
+            parameter_name = "default_author"
+
+            def lookups(self, request, model_admin):
+                return [("all", "All")]
+
+            def queryset(self, request, queryset):
+                if self.value() is None:
+                    return queryset.filter(author_id=1)
+                return queryset
+
+        with mock.patch.object(BookModelAdmin, "list_filter", (DefaultAuthorFilter,)):
+            response, queries = self.get_count_queries()
+        self.assertEqual(response.context["result_count"], 2)
+        self.assertEqual(response.context["all_count"], 4)
+        self.assertEqual(len(queries), 2)
+
+    @mock.patch.object(BookModelAdmin, "result_count_mode", "capped")
+    @mock.patch.object(BookModelAdmin, "result_count_cap", 3)
+    def test_capped_count(self):
+        response, queries = self.get_count_queries()
+        result_count = response.context["result_count"]
+        self.assertFalse(result_count.exact)
+        self.assertEqual(str(result_count), "more than 3")
+        self.assertTrue(all("LIMIT 4" in query for query in queries))
+        self.assertContains(
+            response,
+            '<span class="result-count">more than 3 out of more than 3</span>',
+            html=True,
+        )
+        self.assertContains(response, "Page 1 of many")
+        self.assertTrue(response.context["page_obj"].has_next())
+        self.assertEqual(len(response.context["object_list"]), 2)
+
+        response = self.get(p=2)
+        self.assertEqual(response.context["page_obj"].number, 2)
+        self.assertFalse(response.context["page_obj"].has_next())
+        self.assertEqual(len(response.context["object_list"]), 2)
+
+        # Pages past the end fall back to the first page
+        response = self.get(p=3)
+        self.assertEqual(response.context["page_obj"].number, 1)
+
+    @mock.patch.object(BookModelAdmin, "result_count_mode", "capped")
+    @mock.patch.object(BookModelAdmin, "result_count_cap", 3)
+    def test_capped_count_below_cap_is_exact(self):
+        response = self.get(author__id__exact=1)
+        result_count = response.context["result_count"]
+        self.assertTrue(result_count.exact)
+        self.assertEqual(result_count, 2)
+        self.assertContains(response, "Page 1 of 1")
+
+    @mock.patch.object(BookModelAdmin, "result_count_mode", "estimated")
+    @mock.patch.object(BookModelAdmin, "result_count_cap", 3)
+    def test_estimated_count_falls_back_to_capped_count(self):
+        # SQLite has no planner estimates to offer
+        response = self.get()
+        self.assertEqual(str(response.context["result_count"]), "more than 3")
+
+    @mock.patch.object(BookModelAdmin, "result_count_mode", "estimated")
+    @mock.patch.object(BookModelAdmin, "result_count_cap", 3)
+    @mock.patch("wagtail_modeladmin.pagination.estimate_count", return_value=5000)
+    def test_estimated_count(self, estimate_count):
+        response = self.get()
+        self.assertEqual(str(response.context["result_count"]), "about 5000")
+        self.assertContains(response, "Page 1 of many")
+        self.assertContains(response, "About 5000 books")
+
+
+@mock.patch.object(BookModelAdmin, "pagination_mode", "keyset")
+@mock.patch.object(BookModelAdmin, "list_per_page", 2)
+class TestBookIndexViewKeysetPagination(WagtailTestUtils, TestCase):
+    fixtures = ["modeladmintest_test.json"]
+
+    def setUp(self):
+        self.login()
+
+    def get(self, **params):
+        return self.client.get("/admin/modeladmintest/book/", params)
+
+    def get_titles(self, response):
+        return [book.title for book in response.context["object_list"]]
+
+    def test_paging_forwards_and_backwards(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        page_obj = response.context["page_obj"]
+        self.assertEqual(
+            self.get_titles(response),
+            [
+                "Charlie and the Chocolate Factory",
+                "The Chronicles of the Lord of Narnia",
+            ],
+        )
+        self.assertFalse(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+        self.assertEqual(response.context["result_count"], 4)
+
+        response = self.get(cursor=page_obj.next_cursor)
+        page_obj = response.context["page_obj"]
+        self.assertEqual(
+            self.get_titles(response), ["The Hobbit", "The Lord of the Rings"]
+        )
+        self.assertEqual(page_obj.number, 2)
+        self.assertTrue(page_obj.has_previous())
+        self.assertFalse(page_obj.has_next())
+        self.assertContains(response, "?cursor=")
+
+        response = self.get(cursor=page_obj.previous_cursor)
+        page_obj = response.context["page_obj"]
+        self.assertEqual(page_obj.number, 1)
+        self.assertEqual(
+            self.get_titles(response),
+            [
+                "Charlie and the Chocolate Factory",
+                "The Chronicles of the Lord of Narnia",
+            ],
+        )
+
+    def test_paging_with_filter_and_ordering(self):
+        response = self.get(author=1, o="-0")
+        page_obj = response.context["page_obj"]
+        self.assertEqual(
+            self.get_titles(response), ["The Lord of the Rings", "The Hobbit"]
+        )
+        self.assertFalse(page_obj.has_next())
+
+        response = self.get(o="-0")
+        response = self.get(o="-0", cursor=response.context["page_obj"].next_cursor)
+        self.assertEqual(
+            self.get_titles(response),
+            [
+                "The Chronicles of the Lord of Narnia",
+                "Charlie and the Chocolate Factory",
+            ],
+        )
+
+    def test_invalid_cursor_shows_first_page(self):
+        response = self.get(cursor="notacursor")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["page_obj"].number, 1)
+        self.assertEqual(len(response.context["object_list"]), 2)
+
+    def test_cursor_for_other_ordering_shows_first_page(self):
+        cursor = self.get(o="-0").context["page_obj"].next_cursor
+        response = self.get(cursor=cursor)
+        self.assertEqual(response.context["page_obj"].number, 1)
+        self.assertEqual(
+            self.get_titles(response),
+            [
+                "Charlie and the Chocolate Factory",
+                "The Chronicles of the Lord of Narnia",
+            ],
+        )
+
+    def test_cursor_with_invalid_values_shows_first_page(self):
+        paginator = KeysetPaginator(Book.objects.all(), 2, ["title", "pk"])
+        page_obj = paginator.page(paginator.encode_cursor(2, ["The Hobbit", "two"]))
+        self.assertEqual(page_obj.number, 1)
+        self.assertEqual(len(page_obj), 2)
+
+    def test_deep_pages_do_not_use_offset(self):
+        response = self.get()
+        cursor = response.context["page_obj"].next_cursor
+        with CaptureQueriesContext(connection) as ctx:
+            self.get(cursor=cursor)
+        self.assertFalse(
+            any(" OFFSET " in query["sql"] for query in ctx.captured_queries)
+        )
+
+
+class TestBookIndexViewBackgroundExport(WagtailTestUtils, TestCase):
+    fixtures = ["modeladmintest_test.json"]
+
+    def setUp(self):
+        self.user = self.login()
+        export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(export_dir.cleanup)
+        settings_override = override_settings(
+            WAGTAIL_MODELADMIN_EXPORT_DIR=export_dir.name,
+            WAGTAIL_MODELADMIN_EXPORT_WORKERS=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        patcher = mock.patch.object(BookModelAdmin, "export_in_background", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def export(self, export_format="csv"):
+        response = self.client.get(
+            "/admin/modeladmintest/book/", {"export": export_format}
+        )
+        self.assertEqual(response.status_code, 302)
+        return response["Location"]
+
+    def test_export_redirects_to_status(self):
+        status_url = self.export()
+        self.assertRegex(status_url, r"^/admin/modeladmintest/book/export/[0-9a-f]+/$")
+
+        response = self.client.get(status_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "modeladmin/export_status.html")
+        self.assertContains(response, "Your export 'books-export.csv' is ready")
+        self.assertContains(response, status_url + "?download=1")
+
+    def test_status_as_json(self):
+        status_url = self.export()
+
+        response = self.client.get(status_url, {"format": "json"})
+        self.assertEqual(
+            response.json(),
+            {
+                "status": "complete",
+                "rows": 4,
+                "total": 4,
+                "progress": 100,
+                "download_url": status_url + "?download=1",
+            },
+        )
+
+    def test_download_csv(self):
+        status_url = self.export()
+
+        response = self.client.get(status_url, {"download": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get("content-disposition"),
+            'attachment; filename="books-export.csv"',
+        )
+        data_lines = b"".join(response.streaming_content).decode().split("\n")
+        self.assertEqual(data_lines[0], "Title,Author,Author Date Of Birth\r")
+        self.assertEqual(
+            data_lines[4], "The Lord of the Rings,J. R. R. Tolkien,1892-01-03\r"
+        )
+
+    def test_download_xlsx(self):
+        status_url = self.export("xlsx")
+
+        response = self.client.get(status_url, {"download": "1"})
+        workbook = load_workbook(BytesIO(b"".join(response.streaming_content)))
+        cell_array = [
+            [cell.value for cell in row] for row in workbook.active.iter_rows()
+        ]
+        self.assertEqual(len(cell_array), 5)
+        self.assertEqual(cell_array[0], ["Title", "Author", "Author Date Of Birth"])
+
+    def test_download_unfinished_export(self):
+        job = ExportJob.create(self.user, "csv", "books-export")
+
+        url = "/admin/modeladmintest/book/export/%s/" % job.id
+        response = self.client.get(url)
+        self.assertContains(response, "Preparing your export")
+        response = self.client.get(url, {"download": "1"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_failed_export(self):
+        with mock.patch.object(
+            BookModelIndexView, "write_xlsx", side_effect=RuntimeError("Disk full")
+        ):
+            status_url = self.export("xlsx")
+
+        response = self.client.get(status_url, {"format": "json"})
+        self.assertEqual(response.json()["status"], "failed")
+        response = self.client.get(status_url)
+        self.assertContains(response, "Your export could not be completed")
+
+    def test_other_users_export_not_found(self):
+        status_url = self.export()
+
+        self.login(self.create_superuser("other", password="password"))
+        response = self.client.get(status_url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_export_not_found(self):
+        response = self.client.get("/admin/modeladmintest/book/export/abc123/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_status_for_list_export_per_request(self):
+        job = ExportJob.create(self.user, "csv", "authors-export")
+        url = "/admin/modeladmintest/author/export/%s/" % job.id
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        with mock.patch.object(
+            AuthorModelAdmin, "get_list_export", return_value=("name",)
+        ):
+            response = self.client.get(url)
+        self.assertContains(response, "Preparing your export")
+
+
+class TestBookIndexViewFacets(WagtailTestUtils, TestCase):
+    fixtures = ["modeladmintest_test.json"]
+
+    def setUp(self):
+        self.login()
+        patcher = mock.patch.object(BookModelAdmin, "show_facets", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_facet_queries(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/admin/modeladmintest/book/", params)
+        self.assertEqual(response.status_code, 200)
+        return response, [
+            query["sql"] for query in ctx.captured_queries if '__c"' in query["sql"]
+        ]
+
+    def test_counts(self):
+        response, facet_queries = self.get_facet_queries()
+        # One query counts the books for every author
+        self.assertEqual(len(facet_queries), 1)
+        self.assertContains(response, "J. R. R. Tolkien (2)")
+        self.assertContains(response, "Harper Lee (0)")
+
+    def test_counts_filtered(self):
+        response, facet_queries = self.get_facet_queries({"author__id__exact": 2})
+        self.assertEqual(len(facet_queries), 1)
+        self.assertContains(response, "J. R. R. Tolkien (0)")
+        self.assertContains(response, "Roald Dahl (1)")
+
+    def test_no_counts_for_search_backend_results(self):
+        # Results from the search backend can't be aggregated
+        response, facet_queries = self.get_facet_queries({"q": "hobbit"})
+        self.assertEqual(facet_queries, [])
+        self.assertContains(response, "The Hobbit")
+        self.assertNotContains(response, "J. R. R. Tolkien (")
+
+    def test_counts_not_shown_by_default(self):
+        with mock.patch.object(BookModelAdmin, "show_facets", False):
+            response, facet_queries = self.get_facet_queries()
+        self.assertEqual(facet_queries, [])
+        self.assertNotContains(response, "J. R. R. Tolkien (2)")
+
+    @mock.patch.object(BookModelAdmin, "facets_cache_timeout", 60)
+    def test_counts_cached(self):
+        self.get_facet_queries()
+        response, facet_queries = self.get_facet_queries()
+        self.assertEqual(facet_queries, [])
+        self.assertContains(response, "J. R. R. Tolkien (2)")
+
+        # A different set of results is counted separately
+        response, facet_queries = self.get_facet_queries({"author__id__exact": 2})
+        self.assertEqual(len(facet_queries), 1)
+        self.assertContains(response, "J. R. R. Tolkien (0)")
+
+
+class TestBookLazyListFilter(WagtailTestUtils, TestCase):
+    fixtures = ["modeladmintest_test.json"]
+
+    def setUp(self):
+        self.login()
+        patcher = mock.patch.object(
+            BookModelAdmin, "list_filter", (("author", LazyRelatedFieldListFilter),)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        LazyRelatedFieldListFilter.register_cache_invalidation(
+            Book._meta.get_field("author")
+        )
+
+    def get_choices(self, query):
+        response = self.client.get(
+            "/admin/modeladmintest/book/filter_choices/author/", {"q": query}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_only_selected_choice_rendered(self):
+        response = self.client.get("/admin/modeladmintest/book/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "data-modeladmin-lazy-filter")
+        self.assertContains(response, "wagtail_modeladmin/js/lazy_filter.js")
+        self.assertNotContains(response, "author__id__exact=")
+
+        response = self.client.get(
+            "/admin/modeladmintest/book/", {"author__id__exact": 2}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["result_count"], 1)
+        self.assertContains(response, "?author__id__exact=2")
+        self.assertNotContains(response, "?author__id__exact=1")
+
+    def test_choices(self):
+        self.assertEqual(
+            self.get_choices("tolk"),
+            {"results": [{"value": 1, "label": "J. R. R. Tolkien"}], "more": False},
+        )
+        with mock.patch.object(LazyRelatedFieldListFilter, "max_results", 1):
+            self.assertEqual(
+                self.get_choices("roald"),
+                {"results": [{"value": 2, "label": "Roald Dahl"}], "more": True},
+            )
+
+    def test_choices_searched_in_database(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(len(self.get_choices("dahl")["results"]), 2)
+        queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if 'FROM "modeladmintest_author"' in query["sql"]
+        ]
+        self.assertEqual(len(queries), 1)
+        self.assertIn("LIKE", queries[0])
+        self.assertIn("LIMIT 21", queries[0])
+
+        with mock.patch.object(
+            LazyRelatedFieldListFilter, "search_fields", ("date_of_birth__year",)
+        ):
+            self.assertEqual(self.get_choices("dahl")["results"], [])
+
+    def test_choices_cached_until_related_model_changes(self):
+        self.get_choices("")
+        with CaptureQueriesContext(connection) as ctx:
+            self.get_choices("")
+        self.assertFalse(
+            any(
+                "modeladmintest_author" in query["sql"]
+                for query in ctx.captured_queries
+            )
+        )
+
+        Author.objects.create(
+            name="Tolkien's Biographer", date_of_birth=datetime.date(1950, 1, 1)
+        )
+        self.assertEqual(len(self.get_choices("tolkien")["results"]), 2)
+
+    def test_choices_for_list_filter_per_request(self):
+        url = "/admin/modeladmintest/translatablebook/filter_choices/author/"
+        self.assertEqual(self.client.get(url, {"q": "tolk"}).status_code, 404)
+
+        with mock.patch.object(
+            TranslatableBookModelAdmin,
+            "get_list_filter",
+            return_value=(("author", LazyRelatedFieldListFilter),),
+        ):
+            response = self.client.get(url, {"q": "tolk"})
+        self.assertEqual(
+            response.json()["results"], [{"value": 1, "label": "J. R. R. Tolkien"}]
+        )
+
+    def test_unknown_filter_not_found(self):
+        response = self.client.get(
+            "/admin/modeladmintest/book/filter_choices/title/", {"q": "a"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class TestSearchSuggestions(WagtailTestUtils, TestCase):
+    fixtures = ["modeladmintest_test.json"]
+
+    def setUp(self):
+        self.login()
+
+    def get(self, **params):
+        return self.client.get(
+            "/admin/modeladmintest/author/search_suggestions/", params
+        )
+
+    def test_suggestions(self):
+        response = self.get(q="tolkien")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "results": [
+                    {
+                        "pk": 1,
+                        "label": "J. R. R. Tolkien",
+                        "url": "/admin/modeladmintest/author/edit/1/",
+                    }
+                ],
+                "more": False,
+            },
+        )
+
+    def test_no_search_term(self):
+        self.assertEqual(self.get(q=" ").json(), {"results": [], "more": False})
+
+    @mock.patch.object(AuthorModelAdmin, "search_suggestions_limit", 1)
+    def test_suggestions_capped(self):
+        for limit in ("", "100"):
+            data = self.get(q="roald", limit=limit).json()
+            self.assertEqual(len(data["results"]), 1)
+            self.assertTrue(data["more"])
+
+    def test_limit(self):
+        data = self.get(q="roald", limit="1").json()
+        self.assertEqual(len(data["results"]), 1)
+        self.assertTrue(data["more"])
+
+    @mock.patch.object(AuthorModelAdmin, "search_suggestions_cache_timeout", 30)
+    def test_suggestions_cached(self):
+        self.get(q="roald")
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.get(q="roald").json()
+        self.assertEqual([result["pk"] for result in data["results"]], [2, 3])
+        self.assertFalse(
+            any(
+                "modeladmintest_author" in query["sql"]
+                for query in ctx.captured_queries
+            )
+        )
+
+    def test_search_backend(self):
+        response = self.client.get(
+            "/admin/modeladmintest/book/search_suggestions/", {"q": "hobbit"}
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "pk": 2,
+                    "label": "The Hobbit",
+                    "url": "/admin/modeladmintest/book/edit/2/",
+                }
+            ],
+        )
+
+
 @override_settings(WAGTAIL_I18N_ENABLED=True)
 class TestTranslatableBookIndexView(WagtailTestUtils, TestCase):
     fixtures = ["modeladmintest_test.json"]
@@ -1093,6 +1874,184 @@ class TestEditorAccess(WagtailTestUtils, TestCase):
         self.assertRedirects(response, "/admin/modeladmintest/book/")
 
 
+class DeleteBookBackend:
+    """
+    An authentication backend that only implements has_perm(), granting
+    permission to delete books.
+    """
+
+    def authenticate(self, request, **credentials):
+        return None
+
+    def has_perm(self, user_obj, perm, obj=None):
+        return perm == "modeladmintest.delete_book"
+
+
+class TestPermissionSnapshot(WagtailTestUtils, TestCase):
+    fixtures = ["modeladmintest_test.json"]
+
+    def setUp(self):
+        self.user = self.create_user(username="test2", password="password")
+        self.user.groups.add(Group.objects.get(name="Editors"))
+        self.user.user_permissions.add(
+            Permission.objects.get(
+                codename="change_book",
+                content_type=ContentType.objects.get_for_model(Book),
+            )
+        )
+
+    def get_request(self):
+        request = RequestFactory().get("/admin/")
+        # A fresh user object, as for each request
+        request.user = get_user_model().objects.get(pk=self.user.pk)
+        return request
+
+    def test_snapshot_taken_once_per_request(self):
+        request = self.get_request()
+        snapshot = get_permission_snapshot(request.user)
+        self.assertIs(get_permission_snapshot(request.user), snapshot)
+        self.assertTrue(snapshot.has_perm("modeladmintest.change_book"))
+        self.assertFalse(snapshot.has_perm("modeladmintest.delete_book"))
+        self.assertIsNot(get_permission_snapshot(self.get_request().user), snapshot)
+
+    def test_superuser(self):
+        request = self.get_request()
+        request.user.is_superuser = True
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                BookModelAdmin().permission_helper.user_can_delete_obj(
+                    request.user, Book(pk=1)
+                )
+            )
+
+    def test_checks_for_50_model_admins(self):
+        models = [Book, Author, Publisher, Token, RelatedLink]
+        model_admins = [
+            type("ModelAdmin%d" % i, (ModelAdmin,), {"model": models[i % 5]})()
+            for i in range(50)
+        ]
+        for model_admin in model_admins:
+            # Permission codenames are loaded once per process
+            model_admin.permission_helper.all_permission_names
+
+        request = self.get_request()
+        User = get_user_model()
+        with (
+            mock.patch.object(
+                User, "has_perm", autospec=True, side_effect=User.has_perm
+            ) as has_perm,
+            CaptureQueriesContext(connection) as ctx,
+        ):
+            shown = [
+                model_admin
+                for model_admin in model_admins
+                if model_admin.get_menu_item().is_shown(request)
+                and model_admin.permission_helper.user_can_edit_obj(
+                    request.user, model_admin.model()
+                )
+            ]
+            for model_admin in model_admins:
+                model_admin.permission_helper.user_can_create(request.user)
+                model_admin.permission_helper.user_can_delete_obj(
+                    request.user, model_admin.model()
+                )
+
+        self.assertEqual(len(shown), 10)
+        self.assertTrue(all(model_admin.model is Book for model_admin in shown))
+        # Permissions missing from the snapshot are only checked once each
+        checked_perms = [call.args[1] for call in has_perm.call_args_list]
+        self.assertEqual(len(checked_perms), len(set(checked_perms)))
+        self.assertNotIn("modeladmintest.change_book", checked_perms)
+        # The user's own and their groups' permissions, once for all 200 checks
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    @override_settings(
+        AUTHENTICATION_BACKENDS=[
+            "django.contrib.auth.backends.ModelBackend",
+            "wagtail_modeladmin.test.tests.test_simple_modeladmin.DeleteBookBackend",
+        ]
+    )
+    def test_backend_without_get_all_permissions(self):
+        request = self.get_request()
+        permission_helper = BookModelAdmin().permission_helper
+        self.assertTrue(permission_helper.user_can_delete_obj(request.user, Book(pk=1)))
+        self.assertFalse(permission_helper.user_can_create(request.user))
+        with mock.patch.object(DeleteBookBackend, "has_perm") as has_perm:
+            self.assertTrue(
+                permission_helper.user_can_delete_obj(request.user, Book(pk=2))
+            )
+        has_perm.assert_not_called()
+
+
+class TestMenuVisibility(WagtailTestUtils, TestCase):
+    fixtures = ["modeladmintest_test.json"]
+
+    def setUp(self):
+        self.user = self.create_user(username="test2", password="password")
+        self.user.groups.add(Group.objects.get(name="Editors"))
+        self.add_permission("change_book", Book)
+        self.session = SessionStore()
+        self.resolver = MenuVisibilityResolver()
+        self.book_admin = BookModelAdmin()
+        self.author_admin = AuthorModelAdmin()
+        self.resolver.register(self.book_admin)
+        self.resolver.register(self.author_admin)
+
+    def add_permission(self, codename, model):
+        self.user.user_permissions.add(
+            Permission.objects.get(
+                codename=codename,
+                content_type=ContentType.objects.get_for_model(model),
+            )
+        )
+
+    def get_request(self):
+        request = RequestFactory().get("/admin/")
+        request.user = get_user_model().objects.get(pk=self.user.pk)
+        request.session = self.session
+        return request
+
+    def get_shown(self, request):
+        return [
+            model_admin.model
+            for model_admin in (self.book_admin, self.author_admin)
+            if self.resolver.is_shown(request, model_admin)
+        ]
+
+    def test_resolved_once_per_request(self):
+        request = self.get_request()
+        with mock.patch.object(
+            self.resolver, "resolve", wraps=self.resolver.resolve
+        ) as resolve:
+            self.assertEqual(self.get_shown(request), [Book])
+            self.assertEqual(self.get_shown(request), [Book])
+        resolve.assert_called_once()
+        # Not stored in the session unless enabled
+        self.assertNotIn(MenuVisibilityResolver.session_key, self.session)
+
+    @override_settings(WAGTAIL_MODELADMIN_CACHE_MENU_VISIBILITY=True)
+    def test_cached_in_session(self):
+        self.assertEqual(self.get_shown(self.get_request()), [Book])
+        with mock.patch.object(self.resolver, "resolve") as resolve:
+            self.assertEqual(self.get_shown(self.get_request()), [Book])
+        resolve.assert_not_called()
+
+        # Changing the user's permissions invalidates the cached items
+        self.add_permission("change_author", Author)
+        self.assertEqual(self.get_shown(self.get_request()), [Book, Author])
+
+        self.user.groups.clear()
+        self.user.user_permissions.clear()
+        self.assertEqual(self.get_shown(self.get_request()), [])
+
+    @override_settings(WAGTAIL_MODELADMIN_CACHE_MENU_VISIBILITY=True)
+    def test_cached_for_user(self):
+        self.get_shown(self.get_request())
+        request = self.get_request()
+        request.user = self.create_superuser(username="admin2")
+        self.assertEqual(self.get_shown(request), [Book, Author])
+
+
 class TestHistoryView(WagtailTestUtils, TestCase):
     fixtures = ["modeladmintest_test.json"]
 
@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.contrib.admin.utils import quote
+from django.test import TestCase
+from django.urls import reverse, set_script_prefix
+
+from wagtail_modeladmin.helpers import AdminURLHelper, PageAdminURLHelper
+from wagtail_modeladmin.test.models import Book, EventPage, Token
+
+
+class TestAdminURLHelper(TestCase):
+    def test_object_urls_reverse_once(self):
+        url_helper = AdminURLHelper(Book)
+
+        with mock.patch(
+            "wagtail_modeladmin.helpers.url.reverse", side_effect=reverse
+        ) as mock_reverse:
+            urls = [
+                url_helper.get_action_url(action, quote(pk))
+                for pk in range(1, 101)
+                for action in ("inspect", "edit", "delete")
+            ]
+
+        # One reverse() for each action, rather than for each of the 300 URLs
+        self.assertEqual(mock_reverse.call_count, 3)
+        self.assertEqual(urls[0], "/admin/modeladmintest/book/inspect/1/")
+        self.assertEqual(urls[-1], "/admin/modeladmintest/book/delete/100/")
+
+    def test_quoted_pk(self):
+        url_helper = AdminURLHelper(Token)
+        url = url_helper.get_action_url("edit", quote("BBB/CCC"))
+        self.assertEqual(url, "/admin/modeladmintest/token/edit/BBB_2FCCC/")
+        self.assertEqual(
+            url, reverse("modeladmintest_token_modeladmin_edit", args=["BBB_2FCCC"])
+        )
+
+    def test_pk_not_matching_pattern_is_reversed(self):
+        url_helper = AdminURLHelper(Book)
+
+        with mock.patch(
+            "wagtail_modeladmin.helpers.url.reverse", side_effect=reverse
+        ) as mock_reverse:
+            url = url_helper.get_action_url("edit", "caf\xe9")
+
+        mock_reverse.assert_called_once_with(
+            "modeladmintest_book_modeladmin_edit", args=["caf\xe9"]
+        )
+        self.assertEqual(url, "/admin/modeladmintest/book/edit/caf%C3%A9/")
+
+    def test_script_prefix(self):
+        url_helper = AdminURLHelper(Book)
+        self.assertEqual(
+            url_helper.get_action_url("edit", "1"), "/admin/modeladmintest/book/edit/1/"
+        )
+
+        set_script_prefix("/cms/")
+        self.addCleanup(set_script_prefix, "/")
+        self.assertEqual(
+            url_helper.get_action_url("edit", "1"),
+            "/cms/admin/modeladmintest/book/edit/1/",
+        )
+
+
+class TestPageAdminURLHelper(TestCase):
+    def test_page_urls_reverse_once(self):
+        url_helper = PageAdminURLHelper(EventPage)
+        url_helper.index_url
+
+        with mock.patch(
+            "wagtail_modeladmin.helpers.url.reverse", side_effect=reverse
+        ) as mock_reverse:
+            urls = [
+                url_helper.get_action_url(action, pk)
+                for pk in range(1, 101)
+                for action in ("edit", "copy", "unpublish", "delete")
+            ]
+
+        self.assertEqual(mock_reverse.call_count, 4)
+        self.assertEqual(
+            urls[0], "/admin/pages/1/edit/?next=/admin/modeladmintest/eventpage/"
+        )
+        self.assertEqual(
+            urls[-1], "/admin/pages/100/delete/?next=/admin/modeladmintest/eventpage/"
+        )
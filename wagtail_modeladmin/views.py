@@ -1,5 +1,9 @@
+import csv
+import hashlib
+import uuid
 import warnings
 from collections import OrderedDict
+from itertools import islice
 
 from django import VERSION as DJANGO_VERSION
 from django import forms
@@ -7,6 +11,7 @@ from django.conf import settings
 from django.contrib.admin import FieldListFilter
 from django.contrib.admin.options import IncorrectLookupParameters
 from django.contrib.admin.utils import (
+    NotRelationField,
     get_fields_from_path,
     label_for_field,
     lookup_field,
@@ -15,6 +20,7 @@ from django.contrib.admin.utils import (
     unquote,
 )
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.exceptions import (
     FieldDoesNotExist,
     ImproperlyConfigured,
@@ -24,14 +30,18 @@ from django.core.exceptions import (
 )
 from django.core.paginator import InvalidPage
 from django.db import models, transaction
+from django.db.models.constants import LOOKUP_SEP
 from django.db.models.fields.related import ManyToManyField, OneToOneRel
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.template.defaultfilters import filesizeformat
+from django.template.loader import get_template
 from django.utils.decorators import method_decorator
 from django.utils.encoding import force_str
 from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
 from django.utils.text import capfirst
 from django.utils.translation import gettext as _
 from django.utils.translation import gettext_lazy
@@ -39,15 +49,19 @@ from django.views.generic import TemplateView
 from django.views.generic.edit import FormView
 from django.views.generic.list import MultipleObjectMixin
 from wagtail.admin import messages
-from wagtail.admin.paginator import WagtailPaginator
 from wagtail.admin.ui.tables import Column, DateColumn, Table, UserColumn
 from wagtail.admin.views.generic.base import WagtailAdminTemplateMixin
-from wagtail.admin.views.mixins import SpreadsheetExportMixin
+from wagtail.admin.views.mixins import Echo, SpreadsheetExportMixin
 from wagtail.log_actions import log
 from wagtail.log_actions import registry as log_registry
 from wagtail.models import Locale, RevisionMixin, TranslatableMixin
 
+from .columns import ResultColumn
+from .exports import ExportJob
+from .facets import FacetCounter
+from .filters import LazyRelatedFieldListFilter
 from .forms import ParentChooserForm
+from .pagination import KeysetPaginator, ListingPaginator, get_result_count
 
 try:
     from django.contrib.admin.utils import lookup_spawns_duplicates
@@ -302,10 +316,42 @@ class InstanceSpecificView(WMABaseView):
         return super().get_context_data(**context)
 
 
+class ListingPlan:
+    """
+    Holds the filters, ordering, search results and counts for a single
+    ``IndexView`` request, so that they are worked out once and shared by
+    everything that renders the listing (the context, exports and
+    templates).
+    """
+
+    def __init__(self, view, request):
+        self.view = view
+        self.request = request
+        self.queryset = view.get_queryset(request)
+        # get_queryset() records the filters and ordering as it applies them
+        self.filter_specs = view.filter_specs
+        self.has_filters = view.has_filters
+        self.ordering = view.ordering
+
+    @cached_property
+    def result_count(self):
+        return self.view.get_result_count(self.queryset)
+
+    @cached_property
+    def all_count(self):
+        # Filters can narrow the results even when nothing is in the query
+        # string (e.g. a SimpleListFilter with a default), so the count is
+        # only reused when no conditions were added to the queryset at all
+        if isinstance(self.queryset, models.QuerySet) and not self.queryset.query.where:
+            return self.result_count
+        return self.view.get_result_count(self.view.get_base_queryset(self.request))
+
+
 class IndexView(SpreadsheetExportMixin, WMABaseView):
     ORDER_VAR = "o"
     ORDER_TYPE_VAR = "ot"
     PAGE_VAR = "p"
+    CURSOR_VAR = "cursor"
     SEARCH_VAR = "q"
     ERROR_FLAG = "e"
     EXPORT_VAR = "export"
@@ -317,9 +363,15 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
 
     # add_facets is required by the django.contrib.admin.filters.ListFilter.choices method
     # as of Django 5.0 - see https://github.com/django/django/pull/16495
+    # It's set to True by FacetCounter when ModelAdmin.show_facets is enabled.
     add_facets = False
 
-    paginator_class = WagtailPaginator
+    paginator_class = ListingPaginator
+    keyset_paginator_class = KeysetPaginator
+    listing_plan_class = ListingPlan
+    result_column_class = ResultColumn
+    facet_counter_class = FacetCounter
+    stream_chunk_size = 20
 
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
@@ -332,7 +384,16 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
         self.list_filter = self.model_admin.get_list_filter(request)
         self.search_fields = self.model_admin.get_search_fields(request)
         self.items_per_page = self.model_admin.list_per_page
+        self.pagination_mode = self.model_admin.pagination_mode
         self.select_related = self.model_admin.list_select_related
+        self.prefetch_related = self.model_admin.list_prefetch_related
+        self.only_fields = self.model_admin.get_list_only_fields(request)
+        # Only the single-pass results table can stream its rows
+        self.stream = (
+            self.model_admin.stream_index_view
+            and self.model_admin.single_pass_result_list
+        )
+        self.streamed_rows = None
         self.search_handler = self.model_admin.get_search_handler(
             request, self.search_fields
         )
@@ -343,6 +404,7 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
             self.page_num = int(request.GET.get(self.PAGE_VAR, 0))
         except ValueError:
             self.page_num = 0
+        self.cursor = request.GET.get(self.CURSOR_VAR)
 
         if DJANGO_VERSION >= (5, 0):
             self.params = request.GET.copy()
@@ -351,6 +413,8 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
 
         if self.PAGE_VAR in self.params:
             del self.params[self.PAGE_VAR]
+        if self.CURSOR_VAR in self.params:
+            del self.params[self.CURSOR_VAR]
         if self.ERROR_FLAG in self.params:
             del self.params[self.ERROR_FLAG]
         if self.EXPORT_VAR in self.params:
@@ -358,13 +422,43 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
 
         self.query = request.GET.get(self.SEARCH_VAR, "")
 
-        self.queryset = self.get_queryset(request)
+        self.listing_plan = self.get_listing_plan(request)
+        self.queryset = self.listing_plan.queryset
 
         if self.export in self.FORMATS:
+            if self.model_admin.export_in_background:
+                return self.queue_export(self.queryset, self.export)
             return self.as_spreadsheet(self.queryset, self.export)
 
         return super().dispatch(request, *args, **kwargs)
 
+    @cached_property
+    def result_columns(self):
+        """
+        A ``ResultColumn`` for each item in ``list_display``, compiled once
+        for the request and used to render every row of the results.
+        """
+        return [
+            self.result_column_class(self, field_name, self.request)
+            for field_name in self.list_display
+        ]
+
+    def get_listing_plan(self, request):
+        """
+        Returns a ``ListingPlan`` for the current request, which builds the
+        filtered, ordered and searched queryset once for the whole request.
+        """
+        return self.listing_plan_class(self, request)
+
+    def queue_export(self, queryset, export_format):
+        """
+        Queues an ``ExportJob`` to write the spreadsheet to disk in the
+        background, and redirects to a page reporting on its progress.
+        """
+        job = ExportJob.create(self.request.user, export_format, self.get_filename())
+        job.submit(self, queryset)
+        return redirect(self.url_helper.get_action_url("export", job.id))
+
     def get_filename(self):
         """Get filename for exported spreadsheet, without extension"""
         return getattr(self.model_admin, "export_filename", super().get_filename())
@@ -380,6 +474,30 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
             ).title()
         )
 
+    def get_export_iterator(self, queryset):
+        """
+        Returns an iterator over ``queryset`` for exporting, which fetches
+        rows from the database in chunks of ``export_chunk_size`` rather
+        than loading every row into the queryset's result cache.
+        """
+        if isinstance(queryset, models.QuerySet):
+            return queryset.iterator(chunk_size=self.model_admin.export_chunk_size)
+        return iter(queryset)
+
+    def stream_csv(self, queryset):
+        """
+        Generate a csv file line by line from queryset, to be used in a
+        StreamingHttpResponse, keeping memory use flat however many rows are
+        exported
+        """
+        writer = csv.DictWriter(Echo(), fieldnames=self.list_export)
+        yield writer.writerow(
+            {field: self.get_heading(queryset, field) for field in self.list_export}
+        )
+
+        for item in self.get_export_iterator(queryset):
+            yield self.write_csv_row(writer, self.to_row_dict(item))
+
     def to_row_dict(self, item):
         """Returns an OrderedDict (in the order given by list_export) of the exportable information for a model instance"""
         row_dict = OrderedDict()
@@ -397,12 +515,18 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
 
     @property
     def media(self):
+        js = self.model_admin.get_index_view_extra_js()
+        if any(
+            isinstance(spec, LazyRelatedFieldListFilter)
+            for spec in getattr(self, "filter_specs", ())
+        ):
+            js = js + ["wagtail_modeladmin/js/lazy_filter.js"]
         return forms.Media(
             css={
                 "all": self.model_admin.get_index_view_extra_css()
                 + ["wagtail_modeladmin/css/modeladmin.css"]
             },
-            js=self.model_admin.get_index_view_extra_js(),
+            js=js,
         )
 
     def get_buttons_for_obj(self, obj):
@@ -506,6 +630,16 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
                 p[k] = v
         return "?%s" % urlencode(sorted(p.items()))
 
+    def get_previous_page_query_string(self, page_obj):
+        if getattr(page_obj, "previous_cursor", None):
+            return self.get_query_string({self.CURSOR_VAR: page_obj.previous_cursor})
+        return self.get_query_string({self.PAGE_VAR: page_obj.previous_page_number()})
+
+    def get_next_page_query_string(self, page_obj):
+        if getattr(page_obj, "next_cursor", None):
+            return self.get_query_string({self.CURSOR_VAR: page_obj.next_cursor})
+        return self.get_query_string({self.PAGE_VAR: page_obj.next_page_number()})
+
     def _get_default_ordering(self):
         ordering = []
         if self.model_admin.ordering:
@@ -631,9 +765,25 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
             filters_use_distinct,
         ) = self.get_filters(request)
 
+        # Filters across multi-valued relations can be applied as subqueries,
+        # so that the results don't need distinct()
+        use_subqueries = self.model_admin.relation_filter_mode == "exists"
+        if use_subqueries:
+            filters_use_distinct = False
+
         # Then, we let every list filter modify the queryset to its liking.
         qs = self.get_base_queryset(request)
         for filter_spec in self.filter_specs:
+            field_path = getattr(filter_spec, "field_path", None)
+            if (
+                use_subqueries
+                and field_path
+                and lookup_spawns_duplicates(self.opts, field_path)
+            ):
+                new_qs = filter_spec.queryset(request, self.model._base_manager.all())
+                if new_qs is not None:
+                    qs = qs.filter(pk__in=new_qs.values("pk"))
+                continue
             new_qs = filter_spec.queryset(request, qs)
             if new_qs is not None:
                 qs = new_qs
@@ -642,16 +792,23 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
             # Finally, we apply the remaining lookup parameters from the query
             # string (i.e. those that haven't already been processed by the
             # filters).
-            if DJANGO_VERSION >= (5, 0):
-                from django.contrib.admin.utils import (
-                    build_q_object_from_lookup_parameters,
-                )
-
-                qs = qs.filter(
-                    build_q_object_from_lookup_parameters(remaining_lookup_params)
-                )
-            else:
-                qs = qs.filter(**remaining_lookup_params)
+            if use_subqueries:
+                relation_lookup_params = {
+                    key: value
+                    for key, value in remaining_lookup_params.items()
+                    if lookup_spawns_duplicates(self.opts, key)
+                }
+                if relation_lookup_params:
+                    subquery = self.filter_lookup_params(
+                        self.model._base_manager.all(), relation_lookup_params
+                    )
+                    qs = qs.filter(pk__in=subquery.values("pk"))
+                    remaining_lookup_params = {
+                        key: value
+                        for key, value in remaining_lookup_params.items()
+                        if key not in relation_lookup_params
+                    }
+            qs = self.filter_lookup_params(qs, remaining_lookup_params)
         except (SuspiciousOperation, ImproperlyConfigured):
             # Allow certain types of errors to be re-raised as-is so that the
             # caller can treat them in a special way.
@@ -666,10 +823,14 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
 
         if not qs.query.select_related:
             qs = self.apply_select_related(qs)
+        qs = self.apply_prefetch_related(qs)
+
+        if self.only_fields and qs.query.deferred_loading == (frozenset(), True):
+            qs = qs.only(*self.get_only_field_names(request, qs))
 
         # Set ordering.
-        ordering = self.get_ordering(request, qs)
-        qs = qs.order_by(*ordering)
+        self.ordering = self.get_ordering(request, qs)
+        qs = qs.order_by(*self.ordering)
 
         # Remove duplicates from results, if necessary
         if filters_use_distinct:
@@ -678,11 +839,26 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
         # Apply search results
         return self.get_search_results(request, qs, self.query)
 
+    def filter_lookup_params(self, qs, lookup_params):
+        """
+        Returns ``qs`` filtered by lookup parameters from the query string.
+        """
+        if DJANGO_VERSION >= (5, 0):
+            from django.contrib.admin.utils import (
+                build_q_object_from_lookup_parameters,
+            )
+
+            return qs.filter(build_q_object_from_lookup_parameters(lookup_params))
+        return qs.filter(**lookup_params)
+
     def apply_select_related(self, qs):
         if self.select_related is True:
             return qs.select_related()
 
         if self.select_related is False:
+            select_related = self.get_related_lookups()[0]
+            if select_related:
+                return qs.select_related(*select_related)
             if self.has_related_field_in_list_display():
                 return qs.select_related()
 
@@ -690,6 +866,106 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
             return qs.select_related(*self.select_related)
         return qs
 
+    def apply_prefetch_related(self, qs):
+        lookups = list(self.prefetch_related)
+        declared = {getattr(lookup, "prefetch_to", lookup) for lookup in lookups}
+        lookups += [
+            lookup for lookup in self.get_related_lookups()[1] if lookup not in declared
+        ]
+        if lookups:
+            return qs.prefetch_related(*lookups)
+        return qs
+
+    def get_related_lookups(self):
+        """
+        Returns a ``(select_related, prefetch_related)`` tuple of the lookups
+        needed to display the relations used by ``list_display`` (or
+        ``list_export``, when exporting) without a query per row. Relations to
+        a single object are followed with ``select_related()``, and paths that
+        cross a many-to-many or reverse relation are prefetched instead.
+        Relations used by methods or callables can't be worked out, and should
+        be added to ``list_select_related`` or ``list_prefetch_related``.
+        """
+        if self.export in self.FORMATS:
+            field_names = self.list_export
+        else:
+            field_names = self.list_display
+        select_related = []
+        prefetch_related = []
+        for field_name in field_names:
+            if not isinstance(field_name, str):
+                continue
+            try:
+                fields = get_fields_from_path(self.model, field_name)
+            except (FieldDoesNotExist, NotRelationField):
+                continue
+            # The value of the last field is only fetched from another table
+            # when it is itself a relation
+            if not fields[-1].is_relation:
+                fields = fields[:-1]
+            if not fields:
+                continue
+            lookup = LOOKUP_SEP.join(field_name.split(LOOKUP_SEP)[: len(fields)])
+            # Generic foreign keys are many-to-one, but not concrete
+            if all(
+                field.one_to_one or (field.many_to_one and field.concrete)
+                for field in fields
+            ):
+                lookups = select_related
+            else:
+                lookups = prefetch_related
+            if lookup not in lookups:
+                lookups.append(lookup)
+        return select_related, prefetch_related
+
+    def get_only_field_names(self, request, qs):
+        """
+        Returns the names of the fields to load for each object in ``qs``,
+        when ``list_only_fields`` is enabled: the primary key, any model
+        fields named in ``list_display`` (or ``list_export``, when exporting),
+        the fields the button helper needs, any relations followed by
+        ``select_related()`` or ``prefetch_related()`` and any additional
+        fields named by ``list_only_fields``.
+        """
+        if self.export in self.FORMATS:
+            field_names = self.list_export
+        else:
+            field_names = self.list_display
+        button_helper_class = self.model_admin.get_button_helper_class()
+        names = set(button_helper_class(self, request).get_required_fields())
+        for field_name in field_names:
+            try:
+                field = self.opts.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                names.add(field.name)
+
+        # Relations followed by select_related() can't be deferred, and
+        # prefetching a relation needs its key
+        for lookup in qs._prefetch_related_lookups:
+            lookup = getattr(lookup, "prefetch_through", lookup)
+            try:
+                field = self.opts.get_field(lookup.split(LOOKUP_SEP)[0])
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                names.add(field.name)
+
+        select_related = qs.query.select_related
+        if select_related is True:
+            names.update(
+                field.name
+                for field in self.opts.concrete_fields
+                if field.is_relation and not field.null
+            )
+        elif select_related:
+            names.update(select_related)
+
+        if self.only_fields is not True:
+            names.update(self.only_fields)
+        return sorted(names)
+
     def has_related_field_in_list_display(self):
         for field_name in self.list_display:
             try:
@@ -701,19 +977,66 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
                     return True
         return False
 
+    def get_result_count(self, queryset):
+        """
+        Returns a ``ResultCount`` for ``queryset``, which is exact, capped or
+        estimated depending on ``result_count_mode``.
+        """
+        return get_result_count(
+            queryset,
+            mode=self.model_admin.result_count_mode,
+            cap=self.model_admin.result_count_cap,
+        )
+
+    def get_paginator(self, queryset, count=None):
+        """
+        Returns a paginator for ``queryset``. When ``pagination_mode`` is
+        'keyset', results are paged by seeking past the last row of the
+        previous page, falling back to numbered pages when the results are
+        not a queryset (e.g. from a search backend), the search handler has
+        reordered them (e.g. by rank) or the ordering cannot be used as a
+        keyset.
+        """
+        if (
+            self.pagination_mode == "keyset"
+            and isinstance(queryset, models.QuerySet)
+            and list(queryset.query.order_by) == list(self.listing_plan.ordering)
+        ):
+            try:
+                return self.keyset_paginator_class(
+                    queryset,
+                    self.items_per_page,
+                    self.listing_plan.ordering,
+                    count=count,
+                )
+            except ValueError:
+                pass
+        if issubclass(self.paginator_class, ListingPaginator):
+            return self.paginator_class(queryset, self.items_per_page, count=count)
+        return self.paginator_class(queryset, self.items_per_page)
+
     def get_context_data(self, **kwargs):
         user = self.request.user
-        all_count = self.get_base_queryset().count()
-        queryset = self.get_queryset()
-        result_count = queryset.count()
-        paginator = self.paginator_class(queryset, self.items_per_page)
+        listing_plan = self.listing_plan
+        all_count = listing_plan.all_count
+        result_count = listing_plan.result_count
+        paginator = self.get_paginator(listing_plan.queryset, result_count)
 
-        try:
-            page_obj = paginator.page(self.page_num)
-        except InvalidPage:
-            page_obj = paginator.page(1)
+        if isinstance(paginator, KeysetPaginator):
+            page_obj = paginator.page(self.cursor)
+        else:
+            try:
+                page_obj = paginator.page(self.page_num)
+            except InvalidPage:
+                page_obj = paginator.page(1)
 
         elided_page_range = paginator.get_elided_page_range(self.page_num)
+        self.button_helper.prefetch_permissions(page_obj.object_list)
+
+        if self.model_admin.show_facets and self.has_filters:
+            facet_counter = self.facet_counter_class(self, listing_plan.queryset)
+            if facet_counter.enabled:
+                facet_counter.apply()
 
         context = {
             "view": self,
@@ -730,11 +1053,10 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
         if self.is_pagemodel:
             models = self.model.allowed_parent_page_models()
             allowed_parent_types = [m._meta.verbose_name for m in models]
-            valid_parents = self.permission_helper.get_valid_parent_pages(user)
-            valid_parent_count = valid_parents.count()
+            valid_parents = self.permission_helper.peek_valid_parent_pages(user)
             context.update(
                 {
-                    "no_valid_parents": not valid_parent_count,
+                    "no_valid_parents": not valid_parents,
                     "required_parent_types": allowed_parent_types,
                 }
             )
@@ -745,6 +1067,43 @@ class IndexView(SpreadsheetExportMixin, WMABaseView):
     def get_template_names(self):
         return self.model_admin.get_index_template()
 
+    @cached_property
+    def rows_placeholder(self):
+        return mark_safe("<!-- modeladmin-rows-%s -->" % uuid.uuid4().hex)
+
+    def stream_rows(self, rows):
+        """
+        Called while rendering the results table in streaming mode, with an
+        iterable of the rows to send once the rest of the page has been sent.
+        """
+        self.streamed_rows = rows
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        if not self.stream:
+            return response
+        return StreamingHttpResponse(
+            self.stream_content(response.rendered_content),
+            content_type=response["Content-Type"],
+            status=response.status_code,
+        )
+
+    def stream_content(self, content):
+        """
+        Generate the rendered page for a StreamingHttpResponse, sending
+        everything up to the table's rows at once, followed by the rows in
+        chunks of ``stream_chunk_size`` as they are rendered, and then the
+        rest of the page.
+        """
+        head, placeholder, tail = content.partition(self.rows_placeholder)
+        yield head
+        if placeholder and self.streamed_rows is not None:
+            template = get_template("modeladmin/includes/result_list_rows.html")
+            rows = iter(self.streamed_rows)
+            while chunk := list(islice(rows, self.stream_chunk_size)):
+                yield template.render({"rows": chunk}, self.request)
+        yield tail
+
 
 class CreateView(ModelFormView):
     page_title = gettext_lazy("New")
@@ -755,14 +1114,12 @@ class CreateView(ModelFormView):
     def dispatch(self, request, *args, **kwargs):
         if self.is_pagemodel:
             user = request.user
-            parents = self.permission_helper.get_valid_parent_pages(user)
-            parent_count = parents.count()
+            parents = self.permission_helper.peek_valid_parent_pages(user)
 
             # There's only one available parent for this page type for this
             # user, so we send them along with that as the chosen parent page
-            if parent_count == 1:
-                parent = parents.get()
-                parent_pk = quote(parent.pk)
+            if len(parents) == 1:
+                parent_pk = quote(parents[0].pk)
                 return redirect(
                     self.url_helper.get_action_url(
                         "add", self.app_label, self.model_name, parent_pk
@@ -1190,6 +1547,189 @@ class InspectView(InstanceSpecificView):
         return self.model_admin.get_inspect_template()
 
 
+class ExportStatusView(WMABaseView):
+    page_title = gettext_lazy("Export")
+    job_id = None
+
+    def __init__(self, model_admin, job_id):
+        super().__init__(model_admin)
+        self.job_id = job_id
+
+    def check_action_permitted(self, user):
+        return self.permission_helper.user_can_list(user)
+
+    def get_page_subtitle(self):
+        return capfirst(self.verbose_name_plural)
+
+    def get_job(self):
+        if not self.model_admin.get_list_export(self.request):
+            raise Http404
+        job = ExportJob.get(self.job_id)
+        if job is None or not job.belongs_to(self.request.user):
+            raise Http404
+        return job
+
+    @cached_property
+    def status_url(self):
+        return self.url_helper.get_action_url("export", self.job_id)
+
+    @cached_property
+    def download_url(self):
+        return self.status_url + "?download=1"
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_job()
+        if request.GET.get("download"):
+            if job.status != job.COMPLETE:
+                raise Http404
+            return FileResponse(
+                open(job.output_path, "rb"),
+                as_attachment=True,
+                filename=job.state["filename"],
+            )
+        if request.GET.get("format") == "json":
+            return JsonResponse(
+                {
+                    "status": job.status,
+                    "rows": job.state["rows"],
+                    "total": job.state["total"],
+                    "progress": job.progress,
+                    "download_url": (
+                        self.download_url if job.status == job.COMPLETE else None
+                    ),
+                }
+            )
+        context = self.get_context_data(job=job)
+        return self.render_to_response(context)
+
+    def get_template_names(self):
+        return self.model_admin.get_export_status_template()
+
+
+class FilterChoicesView(WMABaseView):
+    field_path = None
+
+    def __init__(self, model_admin, field_path):
+        super().__init__(model_admin)
+        self.field_path = field_path
+
+    def check_action_permitted(self, user):
+        return self.permission_helper.user_can_list(user)
+
+    def get_filter(self, request):
+        """
+        Returns an instance of the `LazyRelatedFieldListFilter` in
+        `list_filter` for `field_path`.
+        """
+        for list_filter in self.model_admin.get_list_filter(request):
+            if not isinstance(list_filter, (tuple, list)):
+                continue
+            field, filter_class = list_filter
+            if not (
+                isinstance(filter_class, type)
+                and issubclass(filter_class, LazyRelatedFieldListFilter)
+            ):
+                continue
+            if isinstance(field, models.Field):
+                field_path = field.name
+            else:
+                field_path = field
+                field = get_fields_from_path(self.model, field_path)[-1]
+            if field_path == self.field_path:
+                return filter_class(
+                    field, request, {}, self.model, self.model_admin, field_path
+                )
+        raise Http404
+
+    def get(self, request, *args, **kwargs):
+        list_filter = self.get_filter(request)
+        results, more = list_filter.search_choices(request.GET.get("q", ""))
+        return JsonResponse(
+            {
+                "results": [
+                    {"value": value, "label": label} for value, label in results
+                ],
+                "more": more,
+            }
+        )
+
+
+class SearchSuggestionsView(WMABaseView):
+    """
+    Returns the objects best matching a search as JSON, with the URL to edit
+    (or inspect) each one, so that suggestions can be shown as the user types
+    without rendering the whole listing.
+    """
+
+    def check_action_permitted(self, user):
+        return self.permission_helper.user_can_list(user)
+
+    def get_limit(self, request):
+        """
+        Returns the number of suggestions to return, which can be lowered
+        (but not raised) from ``search_suggestions_limit`` by the 'limit'
+        query string parameter.
+        """
+        limit = self.model_admin.search_suggestions_limit
+        try:
+            return max(1, min(int(request.GET["limit"]), limit))
+        except (KeyError, ValueError):
+            return limit
+
+    def get_results(self, request, search_term, limit):
+        """
+        Returns a list of up to ``limit`` objects matching ``search_term``,
+        and whether there are more.
+        """
+        search_handler = self.model_admin.get_search_handler(
+            request, self.model_admin.get_search_fields(request)
+        )
+        if not search_term or not search_handler.show_search_form:
+            return [], False
+        kwargs = self.model_admin.get_extra_search_kwargs(request, search_term)
+        results = search_handler.search_queryset(
+            self.get_base_queryset(request), search_term, **kwargs
+        )
+        objs = list(results[: limit + 1])
+        return objs[:limit], len(objs) > limit
+
+    def get_cache_key(self, request, search_term, limit):
+        # Results depend on the user's permissions, so are cached for each user
+        key = repr((self.opts.label, request.user.pk, search_term, limit))
+        return "wagtail_modeladmin:search_suggestions:%s" % (
+            hashlib.md5(key.encode()).hexdigest()
+        )
+
+    def get_data(self, request, search_term, limit):
+        objs, more = self.get_results(request, search_term, limit)
+        self.button_helper.prefetch_permissions(objs)
+        results = []
+        for obj in objs:
+            button = self.button_helper.get_primary_button(obj)
+            results.append(
+                {
+                    "pk": obj.pk,
+                    "label": str(obj),
+                    "url": button["url"] if button else None,
+                }
+            )
+        return {"results": results, "more": more}
+
+    def get(self, request, *args, **kwargs):
+        search_term = request.GET.get("q", "").strip()
+        limit = self.get_limit(request)
+        cache_timeout = self.model_admin.search_suggestions_cache_timeout
+        if not cache_timeout:
+            return JsonResponse(self.get_data(request, search_term, limit))
+
+        cache_key = self.get_cache_key(request, search_term, limit)
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.get_data(request, search_term, limit)
+            cache.set(cache_key, data, cache_timeout)
+        return JsonResponse(data)
+
+
 class HistoryView(MultipleObjectMixin, WagtailAdminTemplateMixin, InstanceSpecificView):
     page_title = gettext_lazy("History")
     paginate_by = 50